@@ -1,9 +1,9 @@
 from fastapi import APIRouter, HTTPException, Header
-from database import verify_captcha_token
-from typing import Any, Dict, List, Optional
-import os, random, time, mimetypes
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
+from typing import Any, Dict, List, Optional, Set
+import os, random, time
 from pathlib import Path
-import httpx
 
 from services.abstract_service import verify_abstract, create_abstract_captcha
 from utils.signing import verify_image_token
@@ -19,7 +19,7 @@ from config.settings import (
 )
 from infrastructure.redis_client import get_redis, rkey, redis_set_json
 from domain.models import AbstractCaptchaSession
-from state.sessions import ABSTRACT_SESSIONS, ABSTRACT_SESSIONS_LOCK
+from state.sessions import ABSTRACT_SESSIONS
 from utils.cdn import build_cdn_url
 from .routers_utils import map_local_to_key
 from .routers_utils import (
@@ -27,6 +27,8 @@ from .routers_utils import (
     get_class_dir_mapping,
     get_keyword_map,
     batch_predict_prob,
+    verify_request_credentials,
+    log_verify_request,
 )
 from utils.usage import track_api_usage
 
@@ -34,7 +36,7 @@ from utils.usage import track_api_usage
 router = APIRouter()
 
 
-@router.post("/api/abstract-verify")
+@router.post("/api/abstract-verify", response_class=ORJSONResponse)
 async def verify(
     req: AbstractVerifyRequest,
     x_api_key: Optional[str] = Header(None, alias="X-API-Key"),
@@ -42,40 +44,8 @@ async def verify(
 ) -> Dict[str, Any]:
     start_time = time.time()
     
-    # 1) API 키 검증
-    if not x_api_key:
-        raise HTTPException(status_code=401, detail="API key required")
-    
-    # 데모 키 하드코딩 (홈페이지 데모용)
-    DEMO_PUBLIC_KEY = 'rc_live_f49a055d62283fd02e8203ccaba70fc2'
-    
-    if x_api_key == DEMO_PUBLIC_KEY:
-        # 데모 키: 공개키만으로 검증 (브라우저에서 직접 호출)
-        from database import verify_api_key_auto_secret
-        api_key_info = verify_api_key_auto_secret(x_api_key)
-        if not api_key_info or not api_key_info.get('is_demo'):
-            raise HTTPException(status_code=401, detail="Invalid demo API key")
-        print(f"🎯 데모 모드 캡차 검증: {DEMO_PUBLIC_KEY} 사용")
-        
-        # 데모 키도 실제 캡차 검증 진행
-    else:
-        # 일반 키: 공개키+비밀키 검증 (사용자 서버에서 호출)
-        if not x_secret_key:
-            raise HTTPException(status_code=401, detail="Secret key required for non-demo keys")
-        
-        from database import verify_api_key_with_secret
-        api_key_info = verify_api_key_with_secret(x_api_key, x_secret_key)
-        if not api_key_info:
-            raise HTTPException(status_code=401, detail="Invalid API key or secret key")
-        print(f"🔒 일반 모드 캡차 검증: {x_api_key[:20]}... 사용")
-    
-    # 2) 캡차 토큰 검증
-    if not req.captcha_token:
-        raise HTTPException(status_code=400, detail="Captcha token required")
-    
-    token_valid = verify_captcha_token(req.captcha_token, api_key_info['api_key_id'])
-    if not token_valid:
-        raise HTTPException(status_code=400, detail="Invalid or expired captcha token")
+    # 1) API 키 및 2) 캡차 토큰 검증 (동기 DB 호출은 이벤트 루프 밖에서)
+    await run_in_threadpool(verify_request_credentials, x_api_key, x_secret_key, req.captcha_token)
     
     # 3) signatures가 포함되면 무결성 검증
     if req.signatures is not None:
@@ -83,85 +53,26 @@ async def verify(
         for i, sig in enumerate(req.signatures):
             if not isinstance(sig, str):
                 # DB 로깅: 서명 검증 실패 (중복 방지를 위해 request_logs에만 기록)
-                try:
-                    user_id = None
-                    try:
-                        from database import get_db_cursor
-                        with get_db_cursor() as cursor:
-                            cursor.execute("""
-                                SELECT user_id FROM api_keys WHERE key_id = %s LIMIT 1
-                            """, (x_api_key,))
-                            row = cursor.fetchone()
-                            if row and (row.get("user_id") is not None):
-                                user_id = int(row.get("user_id"))
-                    except Exception:
-                        user_id = None
-
-                    from database import log_request_to_request_logs
-                    log_request_to_request_logs(
-                        user_id=user_id or 0,
-                        api_key=x_api_key,
-                        path="/api/abstract-verify",
-                        api_type="abstract",
-                        method="POST",
-                        status_code=400,
-                        response_time=int((time.time() - start_time) * 1000),
-                        user_agent=None
-                    )
-                except Exception:
-                    pass
+                await run_in_threadpool(log_verify_request, x_api_key, 400, start_time, "/api/abstract-verify", "abstract")
                 return {"success": False, "message": "Invalid signature type"}
     
-    result = verify_abstract(req.challenge_id, req.selections, user_id=req.user_id, api_key=x_api_key)
+    result = await run_in_threadpool(
+        verify_abstract, req.challenge_id, req.selections, user_id=req.user_id, api_key=x_api_key
+    )
     
     # DB 로깅: 성공/실패 요청 (중복 방지를 위해 request_logs에만 기록)
     status_code = 200 if result.get("success") else 400
     
     # request_logs에만 기록 (중복 방지)
-    try:
-        user_id = None
-        try:
-            from database import get_db_cursor
-            with get_db_cursor() as cursor:
-                cursor.execute("""
-                    SELECT user_id FROM api_keys WHERE key_id = %s LIMIT 1
-                """, (x_api_key,))
-                row = cursor.fetchone()
-                if row and (row.get("user_id") is not None):
-                    user_id = int(row.get("user_id"))
-        except Exception:
-            user_id = None
-
-        from database import log_request_to_request_logs
-        log_request_to_request_logs(
-            user_id=user_id or 0,
-            api_key=x_api_key,
-            path="/api/abstract-verify",
-            api_type="abstract",
-            method="POST",
-            status_code=status_code,
-            response_time=int((time.time() - start_time) * 1000),
-            user_agent=None
-        )
-    except Exception:
-        pass
+    await run_in_threadpool(log_verify_request, x_api_key, status_code, start_time, "/api/abstract-verify", "abstract")
     
-    return result
+    # 결과 dict는 이미 JSON 호환 타입뿐이므로 jsonable_encoder/모델 검증을 건너뛰고 orjson으로 바로 직렬화
+    return ORJSONResponse(result)
 
 
-@router.post("/api/abstract-captcha")
-def create(
-    x_api_key: Optional[str] = Header(None),
-    x_secret_key: Optional[str] = Header(None),
-    user_agent: Optional[str] = Header(None)
-) -> Dict[str, Any]:
-    import time
-    start_time = time.time()
-    
-    # User-Agent 디버깅 로그
-    print(f"🔍 [AbstractCaptcha] User-Agent: {user_agent}")
-    
-    # API 키 검증 (선택사항이지만 있으면 검증)
+def _verify_challenge_api_key(x_api_key: Optional[str], x_secret_key: Optional[str]) -> Optional[Dict[str, Any]]:
+    """챌린지 발급용 API 키 검증 (DB 조회가 있어 스레드풀에서 호출)."""
+    api_key_info = None
     if x_api_key:
         # 데모 키 하드코딩 (홈페이지 데모용)
         DEMO_PUBLIC_KEY = 'rc_live_f49a055d62283fd02e8203ccaba70fc2'
@@ -187,17 +98,58 @@ def create(
                 if not api_key_info:
                     raise HTTPException(status_code=401, detail="Invalid API key or secret key")
                 print(f"🔐 최종 검증 모드: {x_api_key[:20]}... (공개키+비밀키)")
+    return api_key_info
+
+
+def _log_create_request(api_key_info: Optional[Dict[str, Any]], x_api_key: Optional[str], start_time: float) -> None:
+    # API 요청 로그 저장 (api_request_logs에만 기록)
+    try:
+        if api_key_info and not api_key_info.get('is_demo', False):
+            from database import log_request, update_daily_api_stats
+            
+            response_time = int((time.time() - start_time) * 1000)
+            log_request(
+                user_id=api_key_info['user_id'],
+                api_key=x_api_key,
+                path="/api/abstract-captcha",
+                api_type="abstract",
+                method="POST",
+                status_code=200,
+                response_time=response_time
+            )
+            
+            # 일별 통계 업데이트 (전역)
+            update_daily_api_stats("abstract", True, response_time)
+            
+            print(f"📝 [/api/abstract-captcha] 로그 및 통계 저장 완료")
+    except Exception as e:
+        print(f"⚠️ [/api/abstract-captcha] 로그 저장 실패: {e}")
+
+
+@router.post("/api/abstract-captcha")
+async def create(
+    x_api_key: Optional[str] = Header(None),
+    x_secret_key: Optional[str] = Header(None),
+    user_agent: Optional[str] = Header(None)
+) -> Dict[str, Any]:
+    start_time = time.time()
+    
+    # User-Agent 디버깅 로그
+    print(f"🔍 [AbstractCaptcha] User-Agent: {user_agent}")
+    
+    # API 키 검증 (선택사항이지만 있으면 검증)
+    api_key_info = await run_in_threadpool(_verify_challenge_api_key, x_api_key, x_secret_key)
     
     # 기존 main.py의 생성 로직을 라우터로 이관하여 서비스로 전달
     cls_list, class_dir_map, keyword_map = get_abstract_class_list(), get_class_dir_mapping(), get_keyword_map()
     if not cls_list:
         raise HTTPException(status_code=500, detail="Word list is empty. Configure WORD_LIST_PATH.")
     target_class = random.choice(cls_list)
-    pool = keyword_map.get(target_class, [])
+    pool = keyword_map.get(target_class, ())
     if not pool:
         raise HTTPException(status_code=500, detail=f"No keywords configured for target_class: {target_class}")
-    pool_unique = list(dict.fromkeys([k for k in pool if isinstance(k, str) and k.strip()]))
-    keywords = random.sample(pool_unique, k=1)
+    # 키워드 풀은 로드 시 중복 제거·정리된 튜플
+    keywords = [random.choice(pool)]
 
     is_remote_source = ABSTRACT_CLASS_SOURCE == "remote"
     desired_positive = random.randint(2, 5)
@@ -207,16 +159,12 @@ def create(
         from .routers_utils import get_file_keys_by_class, get_other_class_keys
         class_keys = get_file_keys_by_class(target_class)
         other_keys_all = get_other_class_keys(target_class)
-        random.shuffle(class_keys)
-        random.shuffle(other_keys_all)
-        positives = class_keys[:min_positive_guarantee]
+        # 전체 셔플 후 슬라이스 대신 필요한 개수만 비복원 추출
+        positives = random.sample(class_keys, min(min_positive_guarantee, len(class_keys)))
         negatives_needed = max(0, 9 - len(positives))
-        negatives = other_keys_all[:negatives_needed]
+        negatives = random.sample(other_keys_all, min(negatives_needed, len(other_keys_all)))
         final_paths = positives + negatives
         is_positive_flags = [True] * len(positives) + [False] * len(negatives)
-        while len(final_paths) < 9 and other_keys_all:
-            final_paths.append(other_keys_all.pop())
-            is_positive_flags.append(False)
         if len(final_paths) < 9:
             raise HTTPException(status_code=500, detail="Not enough remote images in manifest")
     else:
@@ -224,12 +172,12 @@ def create(
         from .routers_utils import sample_images_from_dirs, iter_random_images_excluding
         guaranteed_positive_paths = []
         if class_dir_map and target_class in class_dir_map:
-            guaranteed_positive_paths = sample_images_from_dirs(class_dir_map[target_class], desired_count=min_positive_guarantee)
+            guaranteed_positive_paths = await run_in_threadpool(sample_images_from_dirs, class_dir_map[target_class], min_positive_guarantee)
         base_pool_size = 60
         candidate_paths = list(guaranteed_positive_paths)
         if len(candidate_paths) < base_pool_size:
             exclude_dirs = class_dir_map.get(target_class, []) if class_dir_map else []
-            extra = iter_random_images_excluding(ABSTRACT_IMAGE_ROOT, exclude_dirs=exclude_dirs, sample_size=base_pool_size - len(candidate_paths))
+            extra = await run_in_threadpool(iter_random_images_excluding, ABSTRACT_IMAGE_ROOT, exclude_dirs, base_pool_size - len(candidate_paths))
             seen = set(candidate_paths)
             for p in extra:
                 if p not in seen:
@@ -237,37 +185,46 @@ def create(
                     seen.add(p)
         if len(candidate_paths) < 12:
             raise HTTPException(status_code=500, detail="Not enough abstract images in dataset")
-        probs = batch_predict_prob(candidate_paths, target_class)
-        sorted_indices = sorted(range(len(candidate_paths)), key=lambda i: probs[i], reverse=True)
-        guaranteed_indices = set(i for i, p in enumerate(candidate_paths) if p in set(guaranteed_positive_paths))
+        probs = await batch_predict_prob(candidate_paths, target_class)
+        # key에 바운드 메서드를 넘겨 항목마다 파이썬 람다 프레임을 만들지 않음
+        sorted_indices = sorted(range(len(candidate_paths)), key=probs.__getitem__, reverse=True)
+        guaranteed_set = set(guaranteed_positive_paths)
+        guaranteed_indices = set(i for i, p in enumerate(candidate_paths) if p in guaranteed_set)
         selected_indices: List[int] = []
+        selected_set: Set[int] = set()  # 멤버십 검사는 리스트 대신 set으로
         is_positive_flags: List[bool] = []
         for i in list(guaranteed_indices)[:min_positive_guarantee]:
             selected_indices.append(i)
+            selected_set.add(i)
             is_positive_flags.append(True)
-        i_ptr = 0
-        while len([flag for flag in is_positive_flags if flag]) < desired_positive and i_ptr < len(sorted_indices):
-            idx = sorted_indices[i_ptr]
-            i_ptr += 1
-            if idx in selected_indices:
+        # 양성 개수는 반복마다 플래그 리스트를 다시 세지 않고 카운터로 유지 (지금까지 추가된 것은 모두 양성)
+        positive_count = len(is_positive_flags)
+        for idx in sorted_indices:
+            if positive_count >= desired_positive:
+                break
+            if idx in selected_set:
                 continue
             selected_indices.append(idx)
+            selected_set.add(idx)
             is_positive_flags.append(True)
-        neg_pool = list(reversed(sorted_indices))
-        j_ptr = 0
-        while len(selected_indices) < 9 and j_ptr < len(neg_pool):
-            idx = neg_pool[j_ptr]
-            j_ptr += 1
-            if idx in selected_indices or idx in guaranteed_indices:
-                continue
-            selected_indices.append(idx)
-            is_positive_flags.append(False)
-        mid_pool = [i for i in sorted_indices if i not in selected_indices]
-        for idx in mid_pool:
+            positive_count += 1
+        # 음성은 확률 낮은 순으로 (역순 리스트 사본 없이 reversed 이터레이터 사용)
+        for idx in reversed(sorted_indices):
             if len(selected_indices) >= 9:
                 break
+            if idx in selected_set or idx in guaranteed_indices:
+                continue
             selected_indices.append(idx)
+            selected_set.add(idx)
             is_positive_flags.append(False)
+        if len(selected_indices) < 9:
+            for idx in sorted_indices:
+                if len(selected_indices) >= 9:
+                    break
+                if idx in selected_set:
+                    continue
+                selected_indices.append(idx)
+                is_positive_flags.append(False)
         final_paths = [candidate_paths[i] for i in selected_indices]
 
     # 정답 index를 랜덤하게 만들기 위해 final_paths와 is_positive_flags를 함께 셔플
@@ -280,31 +237,9 @@ def create(
         cdn_url = build_cdn_url(str(p), is_remote_source, asset_base_url=ASSET_BASE_URL, map_local_to_key=map_local_to_key)
         images.append({"id": idx, "url": cdn_url or ""})
     
-    result = create_abstract_captcha([img["url"] for img in images], target_class, list(is_positive_flags), keywords)
+    result = await run_in_threadpool(create_abstract_captcha, [img["url"] for img in images], target_class, list(is_positive_flags), keywords)
     
-    # API 요청 로그 저장 (api_request_logs에만 기록)
-    try:
-        if api_key_info and not api_key_info.get('is_demo', False):
-            from database import log_request, update_daily_api_stats
-            import time
-            
-            response_time = int((time.time() - start_time) * 1000)
-            log_request(
-                user_id=api_key_info['user_id'],
-                api_key=x_api_key,
-                path="/api/abstract-captcha",
-                api_type="abstract",
-                method="POST",
-                status_code=200,
-                response_time=response_time
-            )
-            
-            # 일별 통계 업데이트 (전역)
-            update_daily_api_stats("abstract", True, response_time)
-            
-            print(f"📝 [/api/abstract-captcha] 로그 및 통계 저장 완료")
-    except Exception as e:
-        print(f"⚠️ [/api/abstract-captcha] 로그 저장 실패: {e}")
+    await run_in_threadpool(_log_create_request, api_key_info, x_api_key, start_time)
     
     return result
 
@@ -10,6 +10,7 @@ from config.settings import (
     BEHAVIOR_MONGO_DB,
 )
 from database import verify_api_key_auto_secret
+from infrastructure.mongo_client import get_mongo_client
 
 router = APIRouter()
 
@@ -22,8 +23,11 @@ def _get_behavior_mongo_client():
     if not (SAVE_BEHAVIOR_TO_MONGO and BEHAVIOR_MONGO_URI):
         return None
     try:
-        from pymongo import MongoClient  # type: ignore
-        _mongo_client_for_behavior = MongoClient(BEHAVIOR_MONGO_URI, serverSelectionTimeoutMS=3000)
+        # 매니페스트 로더와 같은 URI면 같은 풀을 공유
+        _mongo_client_for_behavior = get_mongo_client(BEHAVIOR_MONGO_URI)
+        if _mongo_client_for_behavior is None:
+            return None
+        # 연결 확인 (예외 발생 시 캐시하지 않음)
         _ = _mongo_client_for_behavior.server_info()
         return _mongo_client_for_behavior
     except Exception:
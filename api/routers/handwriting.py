@@ -1,34 +1,197 @@
 from fastapi import APIRouter, HTTPException, Header
-from typing import Any, Dict, List, Optional
-import base64, uuid, time, json
-from datetime import datetime
+from fastapi.concurrency import run_in_threadpool
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio, base64, os, time, random, queue, threading
 from pathlib import Path
+
 import httpx
+import orjson
 
 from services.handwriting_service import verify_handwriting, create_handwriting_challenge
 from schemas.requests import HandwritingVerifyRequest
-from database import verify_api_key_with_secret, verify_api_key_auto_secret, verify_captcha_token
-from database import log_request, log_request_to_request_logs, update_daily_api_stats, update_daily_api_stats_by_key
+from database import verify_api_key_with_secret, verify_api_key_auto_secret
+from database import log_request, update_daily_api_stats, update_daily_api_stats_by_key
 from config.settings import (
     CAPTCHA_TTL,
     USE_REDIS,
     OCR_API_URL,
     OCR_IMAGE_FIELD,
+    OCR_BATCH_API_URL,
+    OCR_BATCH_MAX_SIZE,
+    OCR_BATCH_MAX_DELAY_MS,
     DEBUG_SAVE_OCR_UPLOADS,
     DEBUG_OCR_DIR,
     SUCCESS_REDIRECT_URL,
     ASSET_BASE_URL,
-    MONGO_URI,
-    MONGO_DB,
-    MONGO_MANIFEST_COLLECTION,
 )
 from utils.text import normalize_text
 from utils.usage import track_api_usage
 from infrastructure.redis_client import rkey, get_redis, redis_get_json
+from infrastructure.http_client import get_http_client
+from state.handwriting import get_handwriting_manifest
+from .routers_utils import verify_request_credentials, log_verify_request
 
 
 router = APIRouter()
 
+# 이 크기(문자 수) 이하의 base64는 스레드풀 전환 비용이 디코드보다 커서 이벤트 루프에서 바로 디코드
+_INLINE_B64_DECODE_MAX = 64 * 1024
+
+# 디버그 업로드 저장은 데몬 스레드가 처리 (요청 경로에서 디스크 쓰기 제거, 큐가 가득 차면 버림)
+_DEBUG_SAVE_QUEUE: "queue.Queue[tuple[Path, bytes]]" = queue.Queue(maxsize=1024)
+_DEBUG_SAVE_THREAD: Optional[threading.Thread] = None
+_DEBUG_SAVE_THREAD_LOCK = threading.Lock()
+
+
+def _debug_save_worker() -> None:
+    while True:
+        path, data = _DEBUG_SAVE_QUEUE.get()
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "wb") as fp:
+                fp.write(data)
+        except Exception as e:
+            print(f"⚠️ OCR 업로드 디버그 저장 실패: {e}")
+
+
+def _enqueue_debug_save(path: Path, data: bytes) -> None:
+    global _DEBUG_SAVE_THREAD
+    if _DEBUG_SAVE_THREAD is None:
+        with _DEBUG_SAVE_THREAD_LOCK:
+            if _DEBUG_SAVE_THREAD is None:
+                _DEBUG_SAVE_THREAD = threading.Thread(target=_debug_save_worker, name="ocr-debug-save", daemon=True)
+                _DEBUG_SAVE_THREAD.start()
+    try:
+        _DEBUG_SAVE_QUEUE.put_nowait((path, data))
+    except queue.Full:
+        pass
+
+
+async def _post_ocr(image_bytes: bytes, lexicon_list: Optional[List[str]] = None) -> Any:
+    field = OCR_IMAGE_FIELD or "file"
+    files = {field: ("handwriting.png", image_bytes, "image/png")}
+    data = None
+    try:
+        if lexicon_list:
+            data = {"lexicon": orjson.dumps(list(lexicon_list)).decode()}
+    except Exception:
+        data = None
+    resp = await get_http_client().post(OCR_API_URL, data=data, files=files, timeout=20.0)
+    resp.raise_for_status()
+    return orjson.loads(resp.content)
+
+
+# 동시 OCR 요청을 모아 배치 엔드포인트로 한 번에 보내는 배처 (OCR_BATCH_API_URL 설정 시 startup에서 시작)
+_OCR_QUEUE: Optional["asyncio.Queue[Tuple[bytes, Optional[List[str]], asyncio.Future]]"] = None
+_OCR_BATCH_TASK: Optional[asyncio.Task] = None
+_OCR_FLUSH_TASKS: set = set()  # 전송 중인 태스크 참조 유지 (GC 방지)
+_OCR_BATCH_UNAVAILABLE = False  # 배치 엔드포인트가 404/405를 주면 이후에는 단건 호출만 사용
+
+
+async def _post_ocr_batch(items: List[Tuple[bytes, Optional[List[str]], asyncio.Future]]) -> List[Any]:
+    # i번째 파일과 i번째 lexicon이 짝을 이루며, 응답도 같은 순서의 결과 리스트
+    files = [("files", (f"{i}.png", image_bytes, "image/png")) for i, (image_bytes, _, _) in enumerate(items)]
+    data = {"lexicons": orjson.dumps([list(lex) if lex else None for _, lex, _ in items]).decode()}
+    resp = await get_http_client().post(OCR_BATCH_API_URL, data=data, files=files, timeout=20.0)
+    resp.raise_for_status()
+    body = orjson.loads(resp.content)
+    results = body.get("results") if isinstance(body, dict) else body
+    if not isinstance(results, list) or len(results) != len(items):
+        raise ValueError(f"OCR batch result length mismatch: expected {len(items)}")
+    # 결과 항목이 문자열이면 단건 응답과 같은 {"text": ...} 형태로 맞춤
+    return [{"text": r} if isinstance(r, str) else r for r in results]
+
+
+async def _flush_ocr_batch(items: List[Tuple[bytes, Optional[List[str]], asyncio.Future]]) -> None:
+    global _OCR_BATCH_UNAVAILABLE
+    results: Optional[List[Any]] = None
+    if len(items) > 1 and not _OCR_BATCH_UNAVAILABLE:
+        try:
+            results = await _post_ocr_batch(items)
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code in (404, 405):
+                _OCR_BATCH_UNAVAILABLE = True
+            print(f"⚠️ OCR 배치 호출 실패(단건 폴백): {e}")
+        except Exception as e:
+            print(f"⚠️ OCR 배치 호출 실패(단건 폴백): {e}")
+    if results is None:
+        # 단건 경로: 항목별 호출을 동시에 수행하고 실패는 해당 요청에만 전달
+        results = await asyncio.gather(*(_post_ocr(b, lex) for b, lex, _ in items), return_exceptions=True)
+    for (_, _, fut), res in zip(items, results):
+        if fut.done():
+            continue
+        if isinstance(res, BaseException):
+            fut.set_exception(res)
+        else:
+            fut.set_result(res)
+
+
+async def _ocr_batch_loop(ocr_queue: "asyncio.Queue[Tuple[bytes, Optional[List[str]], asyncio.Future]]") -> None:
+    loop = asyncio.get_running_loop()
+    max_delay = OCR_BATCH_MAX_DELAY_MS / 1000.0
+    while True:
+        items = [await ocr_queue.get()]
+        deadline = loop.time() + max_delay
+        # 첫 항목 이후 큐가 비어 있으면(동시 요청 없음) 대기 없이 바로 전송해 단독 요청에 지연을 더하지 않음
+        while len(items) < OCR_BATCH_MAX_SIZE and not ocr_queue.empty():
+            items.append(ocr_queue.get_nowait())
+        try:
+            while len(items) > 1 and len(items) < OCR_BATCH_MAX_SIZE:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    items.append(await asyncio.wait_for(ocr_queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+        except asyncio.CancelledError:
+            # 종료 중 모으던 요청도 매달리지 않도록 예외로 끝냄
+            for _, _, fut in items:
+                if not fut.done():
+                    fut.set_exception(RuntimeError("OCR batcher stopped"))
+            raise
+        task = asyncio.create_task(_flush_ocr_batch(items))
+        _OCR_FLUSH_TASKS.add(task)
+        task.add_done_callback(_OCR_FLUSH_TASKS.discard)
+
+
+def start_ocr_batcher() -> None:
+    global _OCR_QUEUE, _OCR_BATCH_TASK
+    if not OCR_BATCH_API_URL or OCR_BATCH_MAX_SIZE <= 1:
+        return
+    if _OCR_BATCH_TASK is not None and not _OCR_BATCH_TASK.done():
+        return
+    _OCR_QUEUE = asyncio.Queue()
+    _OCR_BATCH_TASK = asyncio.create_task(_ocr_batch_loop(_OCR_QUEUE))
+
+
+async def stop_ocr_batcher() -> None:
+    global _OCR_QUEUE, _OCR_BATCH_TASK
+    task, _OCR_BATCH_TASK = _OCR_BATCH_TASK, None
+    ocr_queue, _OCR_QUEUE = _OCR_QUEUE, None
+    # 아직 전송되지 않은 요청은 클라이언트 타임아웃까지 매달려 있지 않도록 예외로 종료
+    while ocr_queue is not None and not ocr_queue.empty():
+        _, _, fut = ocr_queue.get_nowait()
+        if not fut.done():
+            fut.set_exception(RuntimeError("OCR batcher stopped"))
+    if task is None:
+        return
+    task.cancel()
+    try:
+        await task
+    except (asyncio.CancelledError, Exception):
+        pass
+
+
+async def ocr_predict(image_bytes: bytes, lexicon_list: Optional[List[str]] = None) -> Any:
+    ocr_queue = _OCR_QUEUE
+    if ocr_queue is None or _OCR_BATCH_UNAVAILABLE:
+        # 배처 미기동(또는 배치 엔드포인트 없음) 시 단건 호출
+        return await _post_ocr(image_bytes, lexicon_list)
+    fut = asyncio.get_running_loop().create_future()
+    await ocr_queue.put((image_bytes, lexicon_list, fut))
+    return await fut
+
 
 @router.post("/api/handwriting-verify")
 async def verify(
@@ -38,134 +201,44 @@ async def verify(
 ) -> Dict[str, Any]:
     start_time = time.time()
     
-    # 1) API 키 검증
-    if not x_api_key:
-        raise HTTPException(status_code=401, detail="API key required")
-    
-    # 데모 키 하드코딩 (홈페이지 데모용)
-    DEMO_PUBLIC_KEY = 'rc_live_f49a055d62283fd02e8203ccaba70fc2'
-    
-    if x_api_key == DEMO_PUBLIC_KEY:
-        # 데모 키: 공개키만으로 검증 (브라우저에서 직접 호출)
-        api_key_info = verify_api_key_auto_secret(x_api_key)
-        if not api_key_info or not api_key_info.get('is_demo'):
-            raise HTTPException(status_code=401, detail="Invalid demo API key")
-        print(f"🎯 데모 모드 캡차 검증: {DEMO_PUBLIC_KEY} 사용")
-        
-        # 데모 키도 실제 캡차 검증 진행
-    else:
-        # 일반 키: 공개키+비밀키 검증 (사용자 서버에서 호출)
-        if not x_secret_key:
-            raise HTTPException(status_code=401, detail="Secret key required for non-demo keys")
-        
-        api_key_info = verify_api_key_with_secret(x_api_key, x_secret_key)
-        if not api_key_info:
-            raise HTTPException(status_code=401, detail="Invalid API key or secret key")
-        print(f"🔒 일반 모드 캡차 검증: {x_api_key[:20]}... 사용")
-    
-    # 2) 캡차 토큰 검증
-    if not req.captcha_token:
-        raise HTTPException(status_code=400, detail="Captcha token required")
-    
-    token_valid = verify_captcha_token(req.captcha_token, api_key_info['api_key_id'])
-    if not token_valid:
-        raise HTTPException(status_code=400, detail="Invalid or expired captcha token")
+    # 1) API 키 및 2) 캡차 토큰 검증 (동기 DB 호출은 이벤트 루프 밖에서)
+    await run_in_threadpool(verify_request_credentials, x_api_key, x_secret_key, req.captcha_token)
     
     # 3) Base64 디코드 (data:image 접두 처리)
+    # OCR 호출은 multipart(바이트) 경로뿐이므로 디코드는 한 번만 수행하고 재인코딩하지 않는다
     base64_str = req.image_base64 or ""
     if base64_str.startswith("data:image"):
-        base64_str = base64_str.split(",", 1)[1]
+        base64_str = base64_str.partition(",")[2]
     try:
-        image_bytes = base64.b64decode(base64_str)
+        # 큰 업로드는 CPU 바운드 디코드를 스레드풀에서 수행해 이벤트 루프를 막지 않음
+        if len(base64_str) > _INLINE_B64_DECODE_MAX:
+            image_bytes = await run_in_threadpool(base64.b64decode, base64_str)
+        else:
+            image_bytes = base64.b64decode(base64_str)
     except Exception as e:
         # DB 로깅: 실패한 요청 (중복 방지를 위해 request_logs에만 기록)
-        try:
-            user_id = None
-            try:
-                from database import get_db_cursor
-                with get_db_cursor() as cursor:
-                    cursor.execute("""
-                        SELECT user_id FROM api_keys WHERE key_id = %s LIMIT 1
-                    """, (x_api_key,))
-                    row = cursor.fetchone()
-                    if row and (row.get("user_id") is not None):
-                        user_id = int(row.get("user_id"))
-            except Exception:
-                user_id = None
-
-            from database import log_request_to_request_logs
-            log_request_to_request_logs(
-                user_id=user_id or 0,
-                api_key=x_api_key,
-                path="/api/handwriting-verify",
-                api_type="handwriting",
-                method="POST",
-                status_code=400,
-                response_time=int((time.time() - start_time) * 1000),
-                user_agent=None
-            )
-        except Exception:
-            pass
+        await run_in_threadpool(log_verify_request, x_api_key, 400, start_time, "/api/handwriting-verify", "handwriting")
         return {"success": False, "message": f"Invalid base64 image: {e}"}
 
-    # 디버그 저장
+    # 디버그 저장 (백그라운드 스레드에 위임)
     if DEBUG_SAVE_OCR_UPLOADS:
         try:
-            save_dir = Path(DEBUG_OCR_DIR)
-            save_dir.mkdir(parents=True, exist_ok=True)
-            ts = datetime.utcnow().strftime("%Y%m%d_%H%M%S_%f")
-            raw_name = f"ocr_upload_raw_{ts}_{uuid.uuid4().hex[:8]}.png"
-            fpath_raw = save_dir / raw_name
-            with open(fpath_raw, "wb") as fp:
-                fp.write(image_bytes)
+            # 정수 ns 타임스탬프 + 4바이트 난수 (strftime/UUID 객체 생성 없이 정렬 가능한 고유 이름)
+            raw_name = f"ocr_upload_raw_{time.time_ns()}_{os.urandom(4).hex()}.png"
+            _enqueue_debug_save(Path(DEBUG_OCR_DIR) / raw_name, image_bytes)
         except Exception:
             pass
 
     # 2) OCR API 호출
     if not OCR_API_URL:
         # DB 로깅: 설정 오류 (중복 방지를 위해 request_logs에만 기록)
-        try:
-            user_id = None
-            try:
-                from database import get_db_cursor
-                with get_db_cursor() as cursor:
-                    cursor.execute("""
-                        SELECT user_id FROM api_keys WHERE key_id = %s LIMIT 1
-                    """, (x_api_key,))
-                    row = cursor.fetchone()
-                    if row and (row.get("user_id") is not None):
-                        user_id = int(row.get("user_id"))
-            except Exception:
-                user_id = None
-
-            from database import log_request_to_request_logs
-            log_request_to_request_logs(
-                user_id=user_id or 0,
-                api_key=x_api_key,
-                path="/api/handwriting-verify",
-                api_type="handwriting",
-                method="POST",
-                status_code=500,
-                response_time=int((time.time() - start_time) * 1000),
-                user_agent=None
-            )
-        except Exception:
-            pass
+        await run_in_threadpool(log_verify_request, x_api_key, 500, start_time, "/api/handwriting-verify", "handwriting")
         return {"success": False, "message": "OCR_API_URL is not configured on server."}
 
-    def _call_ocr_multipart(lexicon_list: Optional[List[str]] = None):
-        field = OCR_IMAGE_FIELD or "file"
-        files = {field: ("handwriting.png", image_bytes, "image/png")}
-        data = None
-        try:
-            if lexicon_list:
-                data = {"lexicon": json.dumps(list(lexicon_list))}
-        except Exception:
-            data = None
-        return httpx.post(OCR_API_URL, data=data, files=files, timeout=20.0)
-
     # 소형 lexicon 구성: challenge_id를 통해 Redis에서 target_class를 조회하여 전달(가능 시)
+    # 조회한 문서는 아래 디버그 출력에서도 재사용 (요청당 GET 1회)
     lexicon_list: Optional[List[str]] = None
+    _doc: Any = None
     try:
         if get_redis() and (req.challenge_id or ""):
             _doc = redis_get_json(rkey("handwriting", str(req.challenge_id)))
@@ -173,42 +246,16 @@ async def verify(
                 _t = str((_doc.get("target_class") or "").strip())
                 if _t:
                     lexicon_list = [_t]
-    except Exception:
+    except Exception as e:
+        print(f"❌ [handwriting-verify] Redis 조회 오류: {e}")
         lexicon_list = None
 
     try:
-        resp = _call_ocr_multipart(lexicon_list=lexicon_list)
-        resp.raise_for_status()
-        ocr_json = resp.json()
+        # 배처가 기동 중이면 동시 요청과 묶어 한 번에 전송, 아니면 단건 호출
+        ocr_json = await ocr_predict(image_bytes, lexicon_list)
     except Exception as e:
         # DB 로깅: OCR 실패 (중복 방지를 위해 request_logs에만 기록)
-        try:
-            user_id = None
-            try:
-                from database import get_db_cursor
-                with get_db_cursor() as cursor:
-                    cursor.execute("""
-                        SELECT user_id FROM api_keys WHERE key_id = %s LIMIT 1
-                    """, (x_api_key,))
-                    row = cursor.fetchone()
-                    if row and (row.get("user_id") is not None):
-                        user_id = int(row.get("user_id"))
-            except Exception:
-                user_id = None
-
-            from database import log_request_to_request_logs
-            log_request_to_request_logs(
-                user_id=user_id or 0,
-                api_key=x_api_key,
-                path="/api/handwriting-verify",
-                api_type="handwriting",
-                method="POST",
-                status_code=500,
-                response_time=int((time.time() - start_time) * 1000),
-                user_agent=None
-            )
-        except Exception:
-            pass
+        await run_in_threadpool(log_verify_request, x_api_key, 500, start_time, "/api/handwriting-verify", "handwriting")
         return {"success": False, "message": f"OCR API request failed: {e}"}
 
     # 3) 텍스트 추출 및 정규화
@@ -221,59 +268,22 @@ async def verify(
         )
     if not extracted or not isinstance(extracted, str):
         # DB 로깅: OCR 응답 오류 (중복 방지를 위해 request_logs에만 기록)
-        try:
-            user_id = None
-            try:
-                from database import get_db_cursor
-                with get_db_cursor() as cursor:
-                    cursor.execute("""
-                        SELECT user_id FROM api_keys WHERE key_id = %s LIMIT 1
-                    """, (x_api_key,))
-                    row = cursor.fetchone()
-                    if row and (row.get("user_id") is not None):
-                        user_id = int(row.get("user_id"))
-            except Exception:
-                user_id = None
-
-            from database import log_request_to_request_logs
-            log_request_to_request_logs(
-                user_id=user_id or 0,
-                api_key=x_api_key,
-                path="/api/handwriting-verify",
-                api_type="handwriting",
-                method="POST",
-                status_code=500,
-                response_time=int((time.time() - start_time) * 1000),
-                user_agent=None
-            )
-        except Exception:
-            pass
+        await run_in_threadpool(log_verify_request, x_api_key, 500, start_time, "/api/handwriting-verify", "handwriting")
         return {"success": False, "message": "OCR API response missing text field"}
 
     text_norm = normalize_text(extracted)
 
     # 4) 검증 (세션/시도증가/조건부삭제는 서비스 내부에서 처리)
-    #    디버깅을 위해 Redis에서 target_class를 조회하여 예측과 함께 출력
+    #    디버깅용 target_class는 lexicon 구성 시 읽은 Redis 문서를 재사용 (추가 조회 없음)
     target_class_dbg = None
-    try:
-        if get_redis() and (req.challenge_id or ""):
-            print(f"🔧 [handwriting-verify] Redis 조회: challenge_id={req.challenge_id}")
-            _doc = redis_get_json(rkey("handwriting", str(req.challenge_id)))
-            print(f"🔧 [handwriting-verify] Redis 문서: {_doc}")
-            if isinstance(_doc, dict):
-                raw_target_class = _doc.get("target_class")
-                print(f"🔧 [handwriting-verify] 원본 target_class: '{raw_target_class}' (type: {type(raw_target_class)})")
-                target_class_dbg = str((raw_target_class or "").strip()) or None
-                print(f"🔧 [handwriting-verify] 처리된 target_class: '{target_class_dbg}'")
-            else:
-                print(f"⚠️ [handwriting-verify] Redis 문서가 dict가 아님: {type(_doc)}")
-        else:
-            print(f"⚠️ [handwriting-verify] Redis 연결 없거나 challenge_id 없음")
-    except Exception as e:
-        print(f"❌ [handwriting-verify] Redis 조회 오류: {e}")
-        target_class_dbg = None
+    if isinstance(_doc, dict):
+        target_class_dbg = str((_doc.get("target_class") or "").strip()) or None
+    elif _doc is not None:
+        print(f"⚠️ [handwriting-verify] Redis 문서가 dict가 아님: {type(_doc)}")
 
-    result = verify_handwriting(req.challenge_id or "", text_norm, user_id=req.user_id, api_key=x_api_key)
+    result = await run_in_threadpool(
+        verify_handwriting, req.challenge_id or "", text_norm, user_id=req.user_id, api_key=x_api_key
+    )
 
     # 디버깅 로그: 예측값 vs 정답 클래스, 매칭 결과
     try:
@@ -288,33 +298,7 @@ async def verify(
     status_code = 200 if result.get("success") else 400
 
     # 정책: 검증 API는 카운트하지 않음. 상세 로그(request_logs)만 남김
-    try:
-        user_id = None
-        try:
-            from database import get_db_cursor
-            with get_db_cursor() as cursor:
-                cursor.execute("""
-                    SELECT user_id FROM api_keys WHERE key_id = %s LIMIT 1
-                """, (x_api_key,))
-                row = cursor.fetchone()
-                if row and (row.get("user_id") is not None):
-                    user_id = int(row.get("user_id"))
-        except Exception:
-            user_id = None
-
-        from database import log_request_to_request_logs
-        log_request_to_request_logs(
-            user_id=user_id or 0,
-            api_key=x_api_key,
-            path="/api/handwriting-verify",
-            api_type="handwriting",
-            method="POST",
-            status_code=status_code,
-            response_time=int((time.time() - start_time) * 1000),
-            user_agent=None
-        )
-    except Exception:
-        pass
+    await run_in_threadpool(log_verify_request, x_api_key, status_code, start_time, "/api/handwriting-verify", "handwriting")
     
     if result.get("success") and SUCCESS_REDIRECT_URL:
         result["redirect_url"] = SUCCESS_REDIRECT_URL
@@ -361,58 +345,15 @@ async def create_handwriting(
     samples: List[str] = []
     target_class = ""
 
-    # Mongo에서 abstract manifest 로드: { class -> [keys...] }
-    manifest: Dict[str, List[str]] = {}
-    try:
-        if MONGO_URI and MONGO_DB and MONGO_MANIFEST_COLLECTION:
-            from pymongo import MongoClient  # type: ignore
-            client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=3000)
-            try:
-                c = client[MONGO_DB][MONGO_MANIFEST_COLLECTION]
-                # per-class 문서 형태 우선: { _id: 'manifest:...', class: 'apple', keys: [...] }
-                any_docs = False
-                try:
-                    for d in c.find({"_id": {"$regex": "^manifest:"}}, {"class": 1, "keys": 1}):
-                        any_docs = True
-                        cls = str(d.get("class") or "").strip()
-                        keys = [str(x) for x in (d.get("keys") or []) if isinstance(x, (str,))]
-                        if cls and keys:
-                            manifest[cls] = keys
-                except Exception:
-                    pass
-                # 단일 문서 폴백: { _id: MONGO_DOC_ID, data/json_data: { class: [keys] } }
-                if not manifest:
-                    try:
-                        from config.settings import MONGO_DOC_ID  # late import
-                        doc = c.find_one({"_id": MONGO_DOC_ID})
-                        if doc:
-                            data = doc.get("json_data") or doc.get("data")
-                            if isinstance(data, dict):
-                                for k, v in data.items():
-                                    if isinstance(v, list):
-                                        manifest[str(k)] = [str(x) for x in v]
-                                    else:
-                                        manifest[str(k)] = [str(v)]
-                    except Exception:
-                        pass
-            finally:
-                try:
-                    client.close()
-                except Exception:
-                    pass
-    except Exception:
-        pass
+    # abstract manifest { class -> [keys...] }는 프로세스 시작 시 로드된 것을 재사용 (요청당 Mongo 연결/전체 스캔 제거)
+    manifest, classes = get_handwriting_manifest()
 
     # 임의 클래스 선택 및 키 5개 샘플링
-    import random
     try:
-        if manifest:
-            classes = list(manifest.keys())
-            random.shuffle(classes)
-            pick = classes[0]
-            keys = list(manifest.get(pick, []) or [])
-            random.shuffle(keys)
-            picked = keys[:5]
+        if classes:
+            pick = random.choice(classes)
+            keys = manifest.get(pick) or []
+            picked = random.sample(keys, min(5, len(keys)))
             target_class = pick
             # URL 변환: ASSET_BASE_URL 프리픽스가 있으면 적용
             if ASSET_BASE_URL:
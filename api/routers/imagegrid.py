@@ -163,13 +163,13 @@ async def verify_image_grid(
         user_id = None
         try:
             from database import get_db_cursor
-            with get_db_cursor() as cursor:
+            with get_db_cursor(dict_rows=False) as cursor:
                 cursor.execute("""
                     SELECT user_id FROM api_keys WHERE key_id = %s LIMIT 1
                 """, (x_api_key,))
                 row = cursor.fetchone()
-                if row and (row.get("user_id") is not None):
-                    user_id = int(row.get("user_id"))
+                if row and (row[0] is not None):
+                    user_id = int(row[0])
         except Exception:
             user_id = None
 
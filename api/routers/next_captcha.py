@@ -1,14 +1,19 @@
-from fastapi import APIRouter, Header, HTTPException, Request
-from typing import Any, Dict, Optional
+from fastapi import APIRouter, BackgroundTasks, Header, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response
+from typing import Any, Dict, Optional, Tuple
 
-import json
-import httpx
+import asyncio
+import bisect
+import logging
+import math
+import orjson
+import os
 import sys
-import tempfile
+import time
 import uuid
 from datetime import datetime, timedelta
 from pathlib import Path
-import threading
 from bson import ObjectId
 import secrets
 import re
@@ -34,10 +39,45 @@ from infrastructure.redis_client import (
     increment_checkbox_attempts, 
     is_checkbox_session_blocked
 )
+from infrastructure.http_client import get_http_client
+from infrastructure.mongo_client import get_mongo_client
+from infrastructure.mongo_writer import BEHAVIOR_WRITER
 
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# 입력과 무관한 고정 응답은 import 시 한 번만 직렬화
+_BLOCKED_BY_SCORE_BODY = orjson.dumps({
+    "message": "Session blocked due to repeated low confidence scores",
+    "status": "blocked",
+    "is_disabled": True,
+    "error_message": "봇으로 의심됩니다. 다시 확인해주세요.",
+    "captcha_type": "",
+    "next_captcha": "",
+    "captcha_token": None
+})
+_BOT_SUSPECTED_BODY = orjson.dumps({
+    "message": "봇으로 의심됩니다. 다시 확인해주세요.",
+    "status": "bot_suspected",
+    "error_message": "봇으로 의심됩니다. 다시 확인해주세요.",
+    "captcha_type": "",
+    "next_captcha": "",
+    "captcha_token": None
+})
+
+
+# 신뢰도 점수 상한 -> (captcha_type, next_captcha). 위에서부터 처음 만족하는 구간을 사용
+_CAPTCHA_TABLE = (
+    (10, "pass", None),                       # 0-10점: 통과
+    (25, "image", "imagecaptcha"),            # 11-25점: 기본 이미지 캡차
+    (40, "abstract", "abstractcaptcha"),      # 26-40점: 추상 이미지 캡차
+    (90, "handwriting", "handwritingcaptcha"),  # 41-90점: 손글씨 캡차
+)
+# bisect용 상한 목록과 결과. 상한을 넘는 점수(91-100점)는 마지막 ("", "")로 떨어져 차단
+_CAPTCHA_UPPER_BOUNDS = tuple(upper for upper, _, _ in _CAPTCHA_TABLE)
+_CAPTCHA_RESULTS = tuple((t, n) for _, t, n in _CAPTCHA_TABLE) + (("", ""),)
+
 
 def generate_captcha_token(api_key_id: int, captcha_type: str, user_id: int) -> str:
     """
@@ -55,7 +95,7 @@ def generate_captcha_token(api_key_id: int, captcha_type: str, user_id: int) ->
                 """, (token, api_key_id, user_id, captcha_type, expires_at))
         return token
     except Exception as e:
-        print(f"캡차 토큰 생성 오류: {e}")
+        logger.error(f"캡차 토큰 생성 오류: {e}")
         return token  # 오류가 있어도 토큰은 반환
 
 
@@ -84,7 +124,7 @@ def verify_captcha_token(token: str, api_key_id: int) -> tuple[bool, str]:
                     return True, result[1]  # (is_valid, captcha_type)
                 return False, None
     except Exception as e:
-        print(f"캡차 토큰 검증 오류: {e}")
+        logger.error(f"캡차 토큰 검증 오류: {e}")
         return False, None
 
 
@@ -98,8 +138,11 @@ def _get_behavior_mongo_client():
     if not (SAVE_BEHAVIOR_TO_MONGO and BEHAVIOR_MONGO_URI):
         return None
     try:
-        from pymongo import MongoClient  # type: ignore
-        _mongo_client_for_behavior = MongoClient(BEHAVIOR_MONGO_URI, serverSelectionTimeoutMS=3000)
+        # 매니페스트 로더와 같은 URI면 같은 풀을 공유
+        _mongo_client_for_behavior = get_mongo_client(BEHAVIOR_MONGO_URI)
+        if _mongo_client_for_behavior is None:
+            return None
+        # 연결 확인 (예외 발생 시 캐시하지 않음)
         _ = _mongo_client_for_behavior.server_info()
         return _mongo_client_for_behavior
     except Exception:
@@ -111,7 +154,7 @@ def _is_mobile_user_agent(user_agent: str) -> bool:
     User-Agent 문자열을 분석하여 모바일/태블릿 환경인지 판단합니다.
     """
     if not user_agent:
-        print("⚠️ User-Agent가 비어있음")
+        logger.warning("⚠️ User-Agent가 비어있음")
         return False
     
     # 모바일/태블릿 관련 키워드 패턴
@@ -129,10 +172,10 @@ def _is_mobile_user_agent(user_agent: str) -> bool:
             matched_patterns.append(pattern)
     
     if matched_patterns:
-        print(f"🎯 모바일 패턴 매칭: {matched_patterns}")
+        logger.debug(f"🎯 모바일 패턴 매칭: {matched_patterns}")
         return True
     
-    print("💻 데스크톱 환경으로 판단")
+    logger.debug("💻 데스크톱 환경으로 판단")
     return False
 
 
@@ -147,7 +190,7 @@ def _save_behavior_to_mongo(doc: Dict[str, Any], user_agent: Optional[str] = Non
     
     # 모바일 환경 감지 및 저장 건너뛰기
     if _is_mobile_user_agent(user_agent or ""):
-        print("🛡️ 모바일 환경 감지: behavior_data MongoDB 저장 건너뜀")
+        logger.debug("🛡️ 모바일 환경 감지: behavior_data MongoDB 저장 건너뜀")
         return
     
     client = _get_behavior_mongo_client()
@@ -156,48 +199,88 @@ def _save_behavior_to_mongo(doc: Dict[str, Any], user_agent: Optional[str] = Non
     
     # 모든 데이터를 봇 컬렉션에 저장
     collection_name = f"{BEHAVIOR_MONGO_COLLECTION}_bot"
-    print(f"🤖 봇 여부: {is_bot}, 사용할 컬렉션: {collection_name}")
-    print(f"🚨 봇 데이터 저장: {BEHAVIOR_MONGO_DB}.{collection_name}")
+    logger.debug(f"🤖 봇 여부: {is_bot}, 사용할 컬렉션: {collection_name}")
+    logger.info(f"🚨 봇 데이터 저장: {BEHAVIOR_MONGO_DB}.{collection_name}")
     
-    def _worker(payload: Dict[str, Any]):
+    # 배치 writer 큐에 넣기만 하고 반환 (워커가 모아서 insert_many)
+    BEHAVIOR_WRITER.enqueue(client, BEHAVIOR_MONGO_DB, collection_name, doc)
+
+
+def _log_and_save_behavior(
+    behavior_data: Optional[Dict[str, Any]],
+    user_agent: Optional[str],
+    correlation_id: Any = None,
+    is_bot: bool = False,
+) -> None:
+    """샘플 로그, Mongo 저장, 디버그 파일 저장. 응답 이후 BackgroundTasks로 실행."""
+    if correlation_id is not None:
         try:
-            client[BEHAVIOR_MONGO_DB][collection_name].insert_one(payload)
+            mongo_doc = {
+                "_id": correlation_id,
+                "behavior_data": behavior_data,
+                "createdAt": datetime.utcnow().isoformat(),
+            }
+            _save_behavior_to_mongo(mongo_doc, user_agent, is_bot)
         except Exception:
             pass
-    try:
-        threading.Thread(target=_worker, args=(doc,), daemon=True).start()
-    except Exception:
+    page = (behavior_data or {}).get("pageEvents", {}) or {}
+    # 샘플 직렬화는 DEBUG 로그가 켜져 있을 때만 수행
+    if logger.isEnabledFor(logging.DEBUG):
         try:
-            client[BEHAVIOR_MONGO_DB][collection_name].insert_one(doc)
+            sample = {
+                "mouseMovements": (behavior_data or {}).get("mouseMovements", [])[:3],
+                "mouseClicks": (behavior_data or {}).get("mouseClicks", [])[:3],
+                "scrollEvents": (behavior_data or {}).get("scrollEvents", [])[:3],
+                "pageEvents": page,
+            }
+            logger.debug(f"🔎 [/api/next-captcha] sample: {orjson.dumps(sample).decode()[:800]}")
         except Exception:
             pass
+    if not DEBUG_SAVE_BEHAVIOR_DATA:
+        return
+    if _is_mobile_user_agent(user_agent or ""):
+        logger.debug("🛡️ 모바일 환경 감지: behavior_data 파일 저장 건너뜀")
+        return
+    try:
+        save_dir = Path(DEBUG_BEHAVIOR_DIR)
+        save_dir.mkdir(parents=True, exist_ok=True)
+        # 정수 ns 타임스탬프 + 4바이트 난수 (strftime/UUID 객체 생성 없이 정렬 가능한 고유 이름)
+        fname = f"behavior_{time.time_ns()}_{os.urandom(4).hex()}.json"
+        fpath = save_dir / fname
+        # 직렬화는 디버그 저장 시 한 번만 수행하고 크기도 여기서 산출 (orjson은 UTF-8 bytes 반환)
+        body = orjson.dumps({"behavior_data": behavior_data})
+        with open(fpath, "wb") as fp:
+            fp.write(body)
+        logger.debug(f"💾 [/api/next-captcha] saved behavior_data: {os.path.abspath(fpath)} ({len(body)}B)")
+    except Exception as e:
+        logger.warning(f"⚠️ failed to save behavior_data: {e}")
 
 
-@router.post("/api/next-captcha")
-def next_captcha(
-    request: CaptchaRequest, 
-    x_api_key: Optional[str] = Header(None),
-    x_secret_key: Optional[str] = Header(None),
-    user_agent: Optional[str] = Header(None),
-    http_request: Request = None,
-    is_bot_header: Optional[str] = Header(None, alias="is_bot"),
-    x_is_bot: Optional[str] = Header(None, alias="X-Is-Bot"),
-    bot_request: Optional[str] = Header(None, alias="Bot-Request")
-):
-    print(f"🚀 [/api/next-captcha] 요청 시작 - API Key: {x_api_key[:20] if x_api_key else 'None'}...")
+def _authorize_next_captcha(
+    x_api_key: Optional[str],
+    x_secret_key: Optional[str],
+    user_agent: Optional[str],
+    http_request: Optional[Request],
+    is_bot_header: Optional[str],
+) -> Tuple[Dict[str, Any], bool]:
+    """차단 IP/레이트리밋/API 키 검증. 통과하지 못하면 HTTPException.
+    DB·Redis I/O가 블로킹이므로 스레드풀에서 실행하며 (api_key_info, 봇 헤더 여부)를 반환.
+    """
+    logger.debug(f"🚀 [/api/next-captcha] 요청 시작 - API Key: {x_api_key[:20] if x_api_key else 'None'}...")
     
-    # 모든 헤더 디버깅
-    print(f"🔍 모든 헤더: {dict(http_request.headers) if http_request else 'None'}")
+    # 모든 헤더 디버깅 (DEBUG일 때만 dict 변환)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"🔍 모든 헤더: {dict(http_request.headers) if http_request else 'None'}")
     
     # 봇 여부 확인 및 디버깅
     is_bot_request = is_bot_header and is_bot_header.lower() == 'true'
-    print(f"🤖 봇 헤더 값: '{is_bot_header}' -> 봇 요청 여부: {is_bot_request}")
+    logger.debug(f"🤖 봇 헤더 값: '{is_bot_header}' -> 봇 요청 여부: {is_bot_request}")
     if is_bot_request:
-        print("🚨 봇 요청 감지! 봇 전용 컬렉션에 저장됩니다.")
+        logger.info("🚨 봇 요청 감지! 봇 전용 컬렉션에 저장됩니다.")
     
     # 클라이언트 IP 추출
     client_ip = ip_rate_limiter.get_client_ip(http_request)
-    print(f"🌐 클라이언트 IP: {client_ip}")
+    logger.debug(f"🌐 클라이언트 IP: {client_ip}")
 
     # 실행 차단 가드: suspicious_ips 테이블에서 is_blocked=1이면 즉시 차단
     try:
@@ -213,16 +296,16 @@ def next_captcha(
                     (x_api_key or '', client_ip or '')
                 )
                 if cursor.fetchone():
-                    print(f"🚫 실행 차단: api_key={ (x_api_key or '')[:20] }..., ip={client_ip}")
+                    logger.info(f"🚫 실행 차단: api_key={ (x_api_key or '')[:20] }..., ip={client_ip}")
                     raise HTTPException(status_code=403, detail="차단된 IP입니다.")
     except HTTPException:
         raise
     except Exception as e:
         # 가드 체크 실패 시에는 로깅만 하고 계속 진행(fail-open)
-        print(f"⚠️ 실행 차단 가드 확인 실패(무시): {e}")
+        logger.warning(f"⚠️ 실행 차단 가드 확인 실패(무시): {e}")
     
     # IP 기반 Rate Limiting 체크
-    print(f"🔍 IP Rate Limiting 시작: IP={client_ip}, API_KEY={x_api_key[:20] if x_api_key else 'None'}...")
+    logger.debug(f"🔍 IP Rate Limiting 시작: IP={client_ip}, API_KEY={x_api_key[:20] if x_api_key else 'None'}...")
     try:
         ip_rate_limit_result = ip_rate_limiter.check_ip_rate_limit(
             ip_address=client_ip,
@@ -231,22 +314,22 @@ def next_captcha(
             rate_limit_per_day=2000,   # IP당 일당 2000회
             api_key=x_api_key          # API 키 전달 (MySQL 저장용)
         )
-        print(f"✅ IP Rate Limiting 통과: {ip_rate_limit_result['minute_remaining']}/min, {ip_rate_limit_result['hour_remaining']}/hour, {ip_rate_limit_result['day_remaining']}/day 남음")
+        logger.debug(f"✅ IP Rate Limiting 통과: {ip_rate_limit_result['minute_remaining']}/min, {ip_rate_limit_result['hour_remaining']}/hour, {ip_rate_limit_result['day_remaining']}/day 남음")
     except HTTPException as e:
-        print(f"❌ IP Rate Limiting 초과: {e.detail}")
+        logger.warning(f"❌ IP Rate Limiting 초과: {e.detail}")
         raise e
     except Exception as e:
-        print(f"⚠️ IP Rate Limiting 오류 (요청 허용): {e}")
+        logger.warning(f"⚠️ IP Rate Limiting 오류 (요청 허용): {e}")
         # Redis 오류 등으로 IP Rate Limiting이 실패해도 요청은 허용 (fail-open)
     
     # User-Agent 디버깅 로그
-    print(f"🔍 User-Agent: {user_agent}")
+    logger.debug(f"🔍 User-Agent: {user_agent}")
     is_mobile = _is_mobile_user_agent(user_agent or "")
-    print(f"📱 모바일 환경 감지: {is_mobile}")
+    logger.debug(f"📱 모바일 환경 감지: {is_mobile}")
     
     # API 키/시크릿 검증 (데모 모드 예외 허용: 공개키만으로 조회)
     if not x_api_key:
-        print("❌ API 키 없음")
+        logger.warning("❌ API 키 없음")
         raise HTTPException(status_code=401, detail="API key required")
     
     # 데모 키 하드코딩 (홈페이지 데모용)
@@ -259,7 +342,7 @@ def next_captcha(
         api_key_info = verify_api_key_auto_secret(x_api_key)
         if not api_key_info or not api_key_info.get('is_demo'):
             raise HTTPException(status_code=401, detail="Invalid demo api key")
-        print(f"🎯 데모 모드(DB): {DEMO_PUBLIC_KEY} 사용")
+        logger.debug(f"🎯 데모 모드(DB): {DEMO_PUBLIC_KEY} 사용")
     else:
         # 일반: 챌린지 요청은 공개키만, 최종 검증은 공개키+비밀키
         if not x_secret_key:
@@ -267,20 +350,20 @@ def next_captcha(
             api_key_info = verify_api_key_auto_secret(x_api_key)
             if not api_key_info:
                 raise HTTPException(status_code=401, detail="Invalid API key")
-            print(f"🌐 챌린지 요청 모드: {x_api_key[:20]}... (공개키만)")
+            logger.debug(f"🌐 챌린지 요청 모드: {x_api_key[:20]}... (공개키만)")
         else:
             # 4단계: 공개키+비밀키로 최종 검증 (사용자 서버에서 호출)
             api_key_info = verify_api_key_with_secret(x_api_key, x_secret_key)
             if not api_key_info:
                 raise HTTPException(status_code=401, detail="Invalid API key or secret key")
-            print(f"🔐 최종 검증 모드: {x_api_key[:20]}... (공개키+비밀키)")
+            logger.debug(f"🔐 최종 검증 모드: {x_api_key[:20]}... (공개키+비밀키)")
     
     # Rate Limiting 체크
     try:
         rate_limit_per_minute = api_key_info.get('rate_limit_per_minute', 60)
         rate_limit_per_day = api_key_info.get('rate_limit_per_day', 1000)
         
-        print(f"🔒 Rate Limiting 체크: {rate_limit_per_minute}/min, {rate_limit_per_day}/day")
+        logger.debug(f"🔒 Rate Limiting 체크: {rate_limit_per_minute}/min, {rate_limit_per_day}/day")
         
         # Rate Limiting 검증
         rate_limit_result = rate_limiter.check_rate_limit(
@@ -289,10 +372,10 @@ def next_captcha(
             rate_limit_per_day=rate_limit_per_day
         )
         
-        print(f"✅ Rate Limiting 통과: {rate_limit_result['minute_remaining']}/min, {rate_limit_result['day_remaining']}/day 남음")
+        logger.debug(f"✅ Rate Limiting 통과: {rate_limit_result['minute_remaining']}/min, {rate_limit_result['day_remaining']}/day 남음")
         
     except HTTPException as e:
-        print(f"❌ Rate Limiting 초과: {e.detail}")
+        logger.warning(f"❌ Rate Limiting 초과: {e.detail}")
         try:
             # API 키 기반 제한 초과도 의심 IP로 MySQL에 저장
             now_ts = int(datetime.utcnow().timestamp())
@@ -307,10 +390,10 @@ def next_captcha(
                 api_key=x_api_key or ''
             )
         except Exception as _e:
-            print(f"⚠️ API 키 제한 초과 저장 실패(무시): {_e}")
+            logger.warning(f"⚠️ API 키 제한 초과 저장 실패(무시): {_e}")
         raise e
     except Exception as e:
-        print(f"⚠️ Rate Limiting 오류 (요청 허용): {e}")
+        logger.warning(f"⚠️ Rate Limiting 오류 (요청 허용): {e}")
         # Redis 오류 등으로 Rate Limiting이 실패해도 요청은 허용 (fail-open)
     
     # 도메인 검증 (Origin 헤더 확인)
@@ -319,85 +402,73 @@ def next_captcha(
     
     # 사용량 집계는 검증 단계(/api/verify-captcha)에서 타입별로 처리합니다.
     if api_key_info.get('is_demo', False):
-        print("🎯 데모 모드: 발급 단계에서 사용량 업데이트 없음")
+        logger.debug("🎯 데모 모드: 발급 단계에서 사용량 업데이트 없음")
         
         # 데모 키도 실제 캡차 발급 진행
-    
-    # 체크박스 세션 생성 또는 조회
-    checkbox_session_id = request.session_id or str(uuid.uuid4())
-    print(f"🔑 체크박스 세션 ID: {checkbox_session_id}")
+
+    return api_key_info, bool(is_bot_request)
+
+
+def _blocked_checkbox_response(checkbox_session_id: str) -> Optional[Dict[str, Any]]:
+    """차단된 체크박스 세션이면 차단 응답을, 아니면 None을 반환 (ML 호출 전에 실행)."""
+    if not is_checkbox_session_blocked(checkbox_session_id):
+        return None
+    logger.info(f"🚫 차단된 세션: {checkbox_session_id}")
+    return {
+        "message": "Session blocked due to suspicious activity",
+        "status": "blocked",
+        "session_id": checkbox_session_id,
+        "is_blocked": True,
+        "captcha_type": "",
+        "next_captcha": "",
+        "captcha_token": None
+    }
+
+
+def _bootstrap_checkbox_session(
+    request: CaptchaRequest,
+    checkbox_session_id: str,
+) -> Dict[str, Any]:
+    """체크박스 세션 조회/생성. 차단 여부 확인 이후 ML 호출과 동시에 스레드풀에서 실행."""
+    logger.debug(f"🔑 체크박스 세션 ID: {checkbox_session_id}")
     
     # 기존 세션이 있는지 확인
     existing_session = get_checkbox_session(checkbox_session_id)
     if not existing_session:
         # 새 세션 생성
         create_checkbox_session(checkbox_session_id, ttl=300)  # 5분 TTL
-        print(f"✅ 새 체크박스 세션 생성: {checkbox_session_id}")
+        logger.debug(f"✅ 새 체크박스 세션 생성: {checkbox_session_id}")
     else:
-        print(f"📋 기존 체크박스 세션 사용: {checkbox_session_id}")
-    
-    # 세션이 차단되었는지 확인
-    if is_checkbox_session_blocked(checkbox_session_id):
-        print(f"🚫 차단된 세션: {checkbox_session_id}")
-        return {
-            "message": "Session blocked due to suspicious activity",
-            "status": "blocked",
-            "session_id": checkbox_session_id,
-            "is_blocked": True,
-            "captcha_type": "",
-            "next_captcha": "",
-            "captcha_token": None
-        }
+        logger.debug(f"📋 기존 체크박스 세션 사용: {checkbox_session_id}")
     
     behavior_data = request.behavior_data
     correlation_id = ObjectId()
-    try:
-        mm = len((behavior_data or {}).get("mouseMovements", []))
-        mc = len((behavior_data or {}).get("mouseClicks", []))
-        se = len((behavior_data or {}).get("scrollEvents", []))
-        page = (behavior_data or {}).get("pageEvents", {}) or {}
-        approx_bytes = len(json.dumps({"behavior_data": behavior_data}) or "")
-        print(
-            f"📥 [/api/next-captcha] received: counts={{mm:{mm}, mc:{mc}, se:{se}}}, "
-            f"page={{enter:{page.get('enterTime')}, exit:{page.get('exitTime')}, total:{page.get('totalTime')}}}, "
-            f"approx={approx_bytes}B"
-        )
+    # 수신 요약(개수·크기 추정)은 DEBUG 로그에서만 쓰이므로 그때만 계산
+    if logger.isEnabledFor(logging.DEBUG):
         try:
-            mongo_doc = {
-                "_id": correlation_id,
-                "behavior_data": behavior_data,
-                "createdAt": datetime.utcnow().isoformat(),
-            }
-            _save_behavior_to_mongo(mongo_doc, user_agent, is_bot_request)
-        except Exception:
-            pass
-        try:
-            sample = {
-                "mouseMovements": (behavior_data or {}).get("mouseMovements", [])[:3],
-                "mouseClicks": (behavior_data or {}).get("mouseClicks", [])[:3],
-                "scrollEvents": (behavior_data or {}).get("scrollEvents", [])[:3],
-                "pageEvents": page,
-            }
-            print(f"🔎 [/api/next-captcha] sample: {json.dumps(sample, ensure_ascii=False)[:800]}")
+            mm = len((behavior_data or {}).get("mouseMovements", []))
+            mc = len((behavior_data or {}).get("mouseClicks", []))
+            se = len((behavior_data or {}).get("scrollEvents", []))
+            page = (behavior_data or {}).get("pageEvents", {}) or {}
+            # 크기 로그는 재직렬화 없이 이벤트 개수 기반 추정치로 대체
+            approx_bytes = mm * 48 + mc * 64 + se * 48 + 256
+            logger.debug(
+                f"📥 [/api/next-captcha] received: counts={{mm:{mm}, mc:{mc}, se:{se}}}, "
+                f"page={{enter:{page.get('enterTime')}, exit:{page.get('exitTime')}, total:{page.get('totalTime')}}}, "
+                f"approx~{approx_bytes}B"
+            )
         except Exception:
             pass
-        if DEBUG_SAVE_BEHAVIOR_DATA and not _is_mobile_user_agent(user_agent or ""):
-            try:
-                save_dir = Path(DEBUG_BEHAVIOR_DIR)
-                save_dir.mkdir(parents=True, exist_ok=True)
-                ts = datetime.utcnow().strftime("%Y%m%d_%H%M%S_%f")
-                fname = f"behavior_{ts}_{uuid.uuid4().hex[:8]}.json"
-                fpath = save_dir / fname
-                with open(fpath, "w", encoding="utf-8") as fp:
-                    json.dump({"behavior_data": behavior_data}, fp, ensure_ascii=False)
-                print(f"💾 [/api/next-captcha] saved behavior_data: {str(fpath.resolve())}")
-            except Exception as e:
-                print(f"⚠️ failed to save behavior_data: {e}")
-        elif DEBUG_SAVE_BEHAVIOR_DATA and _is_mobile_user_agent(user_agent or ""):
-            print("🛡️ 모바일 환경 감지: behavior_data 파일 저장 건너뜀")
-    except Exception:
-        pass
+    # Mongo 저장은 응답 이후 백그라운드 작업(_log_and_save_behavior)에서 수행
+
+    return {
+        "checkbox_session_id": checkbox_session_id,
+        "behavior_data": behavior_data,
+        "correlation_id": correlation_id,
+    }
 
+
+async def _predict_bot(behavior_data: Optional[Dict[str, Any]]) -> Tuple[float, bool]:
     # 기존 외부 ML API 호출 로직 주석 처리
     # try:
     #     response = httpx.post(ML_PREDICT_BOT_URL, json={"behavior_data": behavior_data})
@@ -418,31 +489,53 @@ def next_captcha(
         # 주의: ml-service가 첨부하신 inference 로직으로 /infer/behavior 를 처리한다고 가정합니다.
         # 요청 본문은 단일 세션 문서(JSON) 그대로 전달 (파일 생성 불필요)
         # ml-service가 루트에 behavior_data 키를 요구하므로 래핑하여 전송
-        payload_for_ml = {"behavior_data": (behavior_data or {})}
-        resp = httpx.post(ML_PREDICT_BOT_URL, json=payload_for_ml, timeout=15)
+        # 본문은 orjson으로 메모리에서 한 번만 직렬화해 그대로 전송 (임시 파일/표준 json 인코딩 없음)
+        body_for_ml = orjson.dumps({"behavior_data": (behavior_data or {})})
+        resp = await get_http_client().post(
+            ML_PREDICT_BOT_URL,
+            content=body_for_ml,
+            headers={"Content-Type": "application/json"},
+        )
         resp.raise_for_status()
-        infer_res = resp.json()
+        infer_res = orjson.loads(resp.content)
         
-        # 🔍 ML service 응답 전체 디버깅
-        print(f"🔍 ML service 전체 응답: {json.dumps(infer_res, ensure_ascii=False)}")
+        # 🔍 ML service 응답 전체 디버깅 (받은 바이트를 그대로 출력, 재직렬화하지 않음)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"🔍 ML service 전체 응답: {resp.content.decode('utf-8', 'replace')}")
         
         confidence_score = float(infer_res.get("confidence_score", 50.0))
         is_bot = bool(infer_res.get("is_bot", False))
         ML_SERVICE_USED = True
-        print(f"🤖 ml-service(best_model) 결과: score={confidence_score:.2f}, is_bot={is_bot}")
+        logger.debug(f"🤖 ml-service(best_model) 결과: score={confidence_score:.2f}, is_bot={is_bot}")
         # 디버깅 필드가 있으면 출력
-        try:
-            dbg = {k: infer_res[k] for k in ["features"] if k in infer_res}
-            if dbg:
-                print(f"🔍 ml-service debug: {json.dumps(dbg, ensure_ascii=False)[:800]}")
-        except Exception:
-            pass
+        if logger.isEnabledFor(logging.DEBUG):
+            try:
+                dbg = {k: infer_res[k] for k in ["features"] if k in infer_res}
+                if dbg:
+                    logger.debug(f"🔍 ml-service debug: {orjson.dumps(dbg).decode()[:800]}")
+            except Exception:
+                pass
     except Exception as e:
-        print(f"❌ ml-service 호출 실패: {e}")
+        logger.warning(f"❌ ml-service 호출 실패: {e}")
         confidence_score = 75.0
         is_bot = False
         ML_SERVICE_USED = False
 
+    return confidence_score, ML_SERVICE_USED
+
+
+def _finalize_next_captcha(
+    api_key_info: Dict[str, Any],
+    x_api_key: Optional[str],
+    user_agent: Optional[str],
+    checkbox_session_id: str,
+    behavior_data: Optional[Dict[str, Any]],
+    correlation_id: ObjectId,
+    confidence_score: float,
+    ML_SERVICE_USED: bool,
+):
+    """ML 점수 기반 후처리(점수 저장/세션 갱신/토큰 발급/로그). 스레드풀에서 실행."""
+
     # 점수 저장: behavior_data의 생성된 correlation_id를 참조하여 별도 컬렉션에 저장
     # 모바일 환경에서는 저장하지 않음
     if not _is_mobile_user_agent(user_agent or ""):
@@ -458,7 +551,7 @@ def next_captcha(
         except Exception:
             pass
     else:
-        print("🛡️ 모바일 환경 감지: behavior_data_score MongoDB 저장 건너뜀")
+        logger.debug("🛡️ 모바일 환경 감지: behavior_data_score MongoDB 저장 건너뜀")
 
     # 봇 탐지 및 세션 상태 관리 (보안 강화)
     is_bot_suspected = confidence_score >= 91
@@ -466,53 +559,30 @@ def next_captcha(
     
     # 차단된 세션 처리
     if session_result.get("is_blocked", False):
-        print(f"🚫 봇 차단: 세션 {checkbox_session_id}")
-        return {
-            "message": "Session blocked due to repeated low confidence scores",
-            "status": "blocked",
-            "is_disabled": True,
-            "error_message": "봇으로 의심됩니다. 다시 확인해주세요.",
-            "captcha_type": "",
-            "next_captcha": "",
-            "captcha_token": None
-        }
+        logger.info(f"🚫 봇 차단: 세션 {checkbox_session_id}")
+        return Response(content=_BLOCKED_BY_SCORE_BODY, media_type="application/json")
     
     # 봇 의심 상태 처리
     if session_result.get("status") == "bot_suspected":
-        print(f"⚠️ 봇 의심: 세션 {checkbox_session_id}")
-        return {
-            "message": "봇으로 의심됩니다. 다시 확인해주세요.",
-            "status": "bot_suspected",
-            "error_message": "봇으로 의심됩니다. 다시 확인해주세요.",
-            "captcha_type": "",
-            "next_captcha": "",
-            "captcha_token": None
-        }
+        logger.warning(f"⚠️ 봇 의심: 세션 {checkbox_session_id}")
+        return Response(content=_BOT_SUSPECTED_BODY, media_type="application/json")
     
     # 모바일 환경에서는 체크박스만 표시하고 다음 캡차 단계로 진행하지 않음
     if _is_mobile_user_agent(user_agent or ""):
-        print("📱 모바일 환경: 체크박스만 표시, 다음 캡차 단계 없음")
+        logger.debug("📱 모바일 환경: 체크박스만 표시, 다음 캡차 단계 없음")
         next_captcha_value = None  # 다음 캡차 없음
         captcha_type = "pass"      # 통과 처리
     else:
-          # 데스크톱 환경: 신뢰도 점수에 따른 캡차 타입 결정
-        if confidence_score <= 10:
-            next_captcha_value = None  # 0-10점: 통과
-            captcha_type = "pass"
-        elif confidence_score <= 25:
-            next_captcha_value = "imagecaptcha"   # 11-25점: 기본 이미지 캡차
-            captcha_type = "image"
-        elif confidence_score <= 40:
-            next_captcha_value = "abstractcaptcha"  # 26-40점: 추상 이미지 캡차
-            captcha_type = "abstract"
-        elif confidence_score <= 90:
-            next_captcha_value = "handwritingcaptcha"  # 41-95점: 손글씨 캡차
-            captcha_type = "handwriting"
-        else:   
-            # confidence_score 96-100점: 봇 의심, 접근 차단
-            print(f"🚫 봇 의심 점수: {confidence_score}, 접근 차단")
-            next_captcha_value = ""  # 캡차 비활성화
-            captcha_type = ""  # 에러 상태로 설정
+        # 데스크톱 환경: 신뢰도 점수에 따른 캡차 타입 결정 (_CAPTCHA_TABLE 참조)
+        # score <= upper 를 만족하는 첫 구간 = bisect_left (제너레이터 순회 없이 이분 탐색 한 번)
+        # NaN/inf는 bisect에서 0번 구간(pass)으로 떨어지므로 먼저 차단 결과로 보냄
+        if math.isfinite(confidence_score):
+            captcha_type, next_captcha_value = _CAPTCHA_RESULTS[bisect.bisect_left(_CAPTCHA_UPPER_BOUNDS, confidence_score)]
+        else:
+            captcha_type, next_captcha_value = _CAPTCHA_RESULTS[-1]
+        if not captcha_type:
+            # 91-100점: 봇 의심, 접근 차단 (captcha_type/next_captcha 모두 빈 문자열)
+            logger.info(f"🚫 봇 의심 점수: {confidence_score}, 접근 차단")
         # 데스크톱 환경: 모든 경우에 handwritingcaptcha로 설정
         # print(f"🎯 모든 경우에 handwritingcaptcha로 설정 (신뢰도: {confidence_score})")
         # next_captcha_value = "handwritingcaptcha"
@@ -528,14 +598,14 @@ def next_captcha(
         else:
             # 데모 키: 메모리 토큰 생성(비DB)
             captcha_token = f"demo_token_{secrets.token_urlsafe(16)}"
-            print("🎯 데모 모드: 데이터베이스 토큰 저장 건너뜀")
+            logger.debug("🎯 데모 모드: 데이터베이스 토큰 저장 건너뜀")
     except Exception as e:
-        print(f"⚠️ 토큰 생성 중 예외 발생: {e}")
+        logger.warning(f"⚠️ 토큰 생성 중 예외 발생: {e}")
 
     # 최종 안전장치: 어떤 경우에도 토큰이 비어있지 않도록
     if not captcha_token:
         captcha_token = f"fallback_token_{secrets.token_urlsafe(16)}"
-        print("⚠️ 토큰 기본값(fallback) 사용")
+        logger.warning("⚠️ 토큰 기본값(fallback) 사용")
     payload: Dict[str, Any] = {
         "message": "Behavior analysis completed",
         "status": "success",
@@ -548,16 +618,17 @@ def next_captcha(
         "is_blocked": False
         # 보안상 민감한 정보 제거: confidence_score, attempts, low_score_attempts, is_bot_detected
     }
-    try:
-        preview = {
-            "captcha_type": captcha_type,
-            "next_captcha": next_captcha_value,
-            "ml_service_used": ML_SERVICE_USED,
-            # 보안상 민감한 정보 제거: confidence_score, is_bot_detected
-        }
-        print(f"📦 [/api/next-captcha] response: {json.dumps(preview, ensure_ascii=False)}")
-    except Exception:
-        pass
+    if logger.isEnabledFor(logging.DEBUG):
+        try:
+            preview = {
+                "captcha_type": captcha_type,
+                "next_captcha": next_captcha_value,
+                "ml_service_used": ML_SERVICE_USED,
+                # 보안상 민감한 정보 제거: confidence_score, is_bot_detected
+            }
+            logger.debug(f"📦 [/api/next-captcha] response: {orjson.dumps(preview).decode()}")
+        except Exception:
+            pass
     
     # API 요청 로그 저장 (pass일 때만, 중복 방지를 위해 api_request_logs에만 기록)
     try:
@@ -578,10 +649,60 @@ def next_captcha(
             
             # 사용자별 일별 통계는 log_request에서 자동으로 처리됨
             
-            print(f"📝 [/api/next-captcha] 로그 및 통계 저장 완료")
+            logger.debug(f"📝 [/api/next-captcha] 로그 및 통계 저장 완료")
     except Exception as e:
-        print(f"⚠️ [/api/next-captcha] 로그 저장 실패: {e}")
+        logger.warning(f"⚠️ [/api/next-captcha] 로그 저장 실패: {e}")
     
     return payload
 
 
+@router.post("/api/next-captcha")
+async def next_captcha(
+    request: CaptchaRequest, 
+    x_api_key: Optional[str] = Header(None),
+    x_secret_key: Optional[str] = Header(None),
+    user_agent: Optional[str] = Header(None),
+    http_request: Request = None,
+    is_bot_header: Optional[str] = Header(None, alias="is_bot"),
+    x_is_bot: Optional[str] = Header(None, alias="X-Is-Bot"),
+    bot_request: Optional[str] = Header(None, alias="Bot-Request"),
+    background: BackgroundTasks = None,
+):
+    api_key_info, is_bot_request = await run_in_threadpool(
+        _authorize_next_captcha, x_api_key, x_secret_key, user_agent, http_request, is_bot_header
+    )
+
+    # 체크박스 세션 생성 또는 조회
+    checkbox_session_id = request.session_id or str(uuid.uuid4())
+    # 차단 여부는 ML 호출 전에 확인: 차단된 세션의 반복 요청이 ML 추론을 유발하지 않도록 함
+    # (새로 발급한 세션 ID는 아직 존재하지 않으므로 차단될 수 없어 조회 생략)
+    if request.session_id:
+        blocked_response = await run_in_threadpool(_blocked_checkbox_response, checkbox_session_id)
+        if blocked_response is not None:
+            return blocked_response
+
+    # 차단되지 않은 세션만 세션 부트스트랩(Redis)과 ML 추론을 동시에 진행
+    # ML 호출은 공유 AsyncClient로 이벤트 루프에서 대기 (스레드풀 점유 없음)
+    ctx, (confidence_score, ML_SERVICE_USED) = await asyncio.gather(
+        run_in_threadpool(_bootstrap_checkbox_session, request, checkbox_session_id),
+        _predict_bot(request.behavior_data),
+    )
+
+    # 샘플 로그/Mongo 저장/디버그 저장은 응답 전송 후 실행
+    background.add_task(
+        _log_and_save_behavior, ctx["behavior_data"], user_agent, ctx["correlation_id"], is_bot_request
+    )
+
+    return await run_in_threadpool(
+        _finalize_next_captcha,
+        api_key_info,
+        x_api_key,
+        user_agent,
+        ctx["checkbox_session_id"],
+        ctx["behavior_data"],
+        ctx["correlation_id"],
+        confidence_score,
+        ML_SERVICE_USED,
+    )
+
+
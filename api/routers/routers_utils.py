@@ -1,9 +1,13 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Tuple, Optional
-import random, time, mimetypes, json, os
+from typing import Any, Dict, List, Sequence, Tuple, Optional
+import asyncio, random, threading, time, os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-import httpx
+
+import orjson
+from fastapi import HTTPException
 
 from config.settings import (
     WORD_LIST_PATH,
@@ -15,51 +19,53 @@ from config.settings import (
     MONGO_DB,
     MONGO_MANIFEST_COLLECTION,
     MONGO_DOC_ID,
+    ABSTRACT_BATCH_MAX_SIZE,
+    ABSTRACT_BATCH_MAX_DELAY_MS,
+    ABSTRACT_IMAGE_INDEX_TTL_SECONDS,
 )
+from infrastructure.http_client import get_http_client
+from infrastructure.mongo_client import get_mongo_client
 
 
-def _load_word_list(path: str) -> List[str]:
+def _load_word_list(path: str) -> Tuple[str, ...]:
     try:
-        lines = []
+        # 로드 시 1회 정리(공백 제거·중복 제거)하여 불변 튜플로 보관 (random.choice용 시퀀스)
         with open(path, "r", encoding="utf-8") as f:
-            for line in f:
-                t = line.strip()
-                if not t:
-                    continue
-                lines.append(t)
-        return lines
+            return tuple(dict.fromkeys(t for t in (line.strip() for line in f) if t))
     except Exception:
-        return []
+        return ()
 
 
-def _load_class_dir_map(path: str) -> Dict[str, List[str]]:
+def _load_class_dir_map(path: str) -> Dict[str, Tuple[str, ...]]:
     if not path:
         return {}
-    import json
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        mapping: Dict[str, List[str]] = {}
+        # 바이너리로 읽어 orjson이 UTF-8을 직접 파싱 (텍스트 디코드 단계 생략)
+        with open(path, "rb") as f:
+            data = orjson.loads(f.read())
+        mapping: Dict[str, Tuple[str, ...]] = {}
         if isinstance(data, dict):
             for k, v in data.items():
                 if isinstance(v, list):
-                    mapping[str(k)] = [str(x) for x in v]
+                    mapping[str(k)] = tuple(str(x) for x in v)
                 else:
-                    mapping[str(k)] = [str(v)]
+                    mapping[str(k)] = (str(v),)
         return mapping
     except Exception:
         return {}
-def _load_keyword_map(path: str) -> Dict[str, List[str]]:
+def _load_keyword_map(path: str) -> Dict[str, Tuple[str, ...]]:
     if not path:
         return {}
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        mapping: Dict[str, List[str]] = {}
+        # 바이너리로 읽어 orjson이 UTF-8을 직접 파싱 (텍스트 디코드 단계 생략)
+        with open(path, "rb") as f:
+            data = orjson.loads(f.read())
+        mapping: Dict[str, Tuple[str, ...]] = {}
         if isinstance(data, dict):
             for k, v in data.items():
                 if isinstance(v, list):
-                    cleaned = [str(x).strip() for x in v if str(x).strip()]
+                    # 요청마다 중복 제거하지 않도록 로드 시 1회 정리하여 불변 튜플로 보관
+                    cleaned = tuple(dict.fromkeys(str(x).strip() for x in v if str(x).strip()))
                     if cleaned:
                         mapping[str(k)] = cleaned
         return mapping
@@ -71,100 +77,231 @@ def _load_file_keys_manifest_from_mongo(uri: str, db: str, col: str, doc_id: str
     try:
         if not (uri and db and col):
             return {}
+        client = get_mongo_client(uri)
+        if client is None:
+            return {}
+        c = client[db][col]
+        mapping: Dict[str, List[str]] = {}
         try:
-            from pymongo import MongoClient  # type: ignore
+            # 앵커(^)가 있는 접두 정규식이라 _id 인덱스 범위 스캔. 큰 배치로 왕복 횟수를 줄이고 comment로 식별
+            cur = c.find(
+                {"_id": {"$regex": "^manifest:"}},
+                {"class": 1, "keys": 1},
+                batch_size=500,
+                comment="manifest_load",
+            )
+            for d in cur:
+                cls = str(d.get("class") or "").strip()
+                keys = [x for x in (d.get("keys") or ()) if isinstance(x, str)]
+                if cls and keys:
+                    mapping[cls] = keys
+            if mapping:
+                return mapping
         except Exception:
-            return {}
-        client = MongoClient(uri, serverSelectionTimeoutMS=3000)
+            pass
         try:
-            c = client[db][col]
-            mapping: Dict[str, List[str]] = {}
-            try:
-                cur = c.find({"_id": {"$regex": "^manifest:"}}, {"class": 1, "keys": 1})
-                for d in cur:
-                    cls = str(d.get("class") or "").strip()
-                    keys = [str(x) for x in (d.get("keys") or []) if isinstance(x, (str,))]
-                    if cls and keys:
-                        mapping[cls] = keys
-                if mapping:
+            doc = c.find_one({"_id": doc_id})
+            if doc:
+                data = doc.get("json_data") or doc.get("data")
+                if isinstance(data, dict):
+                    for k, v in data.items():
+                        if isinstance(v, list):
+                            mapping[str(k)] = [str(x) for x in v]
+                        else:
+                            mapping[str(k)] = [str(v)]
                     return mapping
-            except Exception:
-                pass
-            try:
-                doc = c.find_one({"_id": doc_id})
-                if doc:
-                    data = doc.get("json_data") or doc.get("data")
-                    if isinstance(data, dict):
-                        for k, v in data.items():
-                            if isinstance(v, list):
-                                mapping[str(k)] = [str(x) for x in v]
-                            else:
-                                mapping[str(k)] = [str(v)]
-                        return mapping
-            except Exception:
-                pass
-            return {}
-        finally:
-            try:
-                client.close()
-            except Exception:
-                pass
+        except Exception:
+            pass
+        return {}
     except Exception:
         return {}
 
 
 
-def sample_images_from_dirs(dirs: List[str], desired_count: int) -> List[str]:
+def sample_images_from_dirs(dirs: Sequence[str], desired_count: int) -> List[str]:
     paths: List[str] = []
-    from pathlib import Path as _Path
-    import random as _random
     for d in dirs:
-        p = _Path(d)
-        if not p.exists() or not p.is_dir():
+        # 디렉터리만 한 번 resolve하고 파일 경로는 조인 (파일마다 realpath 호출하지 않음)
+        root = _resolve_dir(d)
+        try:
+            with os.scandir(root) as it:
+                files = [e.path for e in it if e.name.lower().endswith(_IMAGE_EXTS) and e.is_file()]
+        except OSError:
             continue
-        files = [fp for fp in p.iterdir() if fp.is_file() and fp.suffix.lower() in (".jpg", ".jpeg", ".png", ".gif")]
-        _random.shuffle(files)
-        for f in files:
-            paths.append(str(f.resolve()))
-            if len(paths) >= desired_count:
-                break
+        # 전체 셔플(O(n)) 대신 남은 개수만큼만 뽑음(O(k))
+        remaining = desired_count - len(paths)
+        paths.extend(random.sample(files, min(remaining, len(files))))
         if len(paths) >= desired_count:
             break
-    _random.shuffle(paths)
-    return paths[:desired_count]
+    # 디렉터리 순서가 결과에 드러나지 않도록 최종 k개만 섞음
+    random.shuffle(paths)
+    return paths
+
+
+
 
+_IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".gif")
+# 허용 확장자는 4종뿐이므로 mimetypes 조회 대신 고정 매핑 사용
+_EXT_MIME = {".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".png": "image/png", ".gif": "image/gif"}
 
-def iter_random_images_excluding(root_dir: str, exclude_dirs: List[str], sample_size: int) -> List[str]:
-    root = Path(root_dir).resolve()
-    exclude_roots = [Path(d).resolve() for d in exclude_dirs if d]
 
-    def _is_under_excluded(p: Path) -> bool:
+def _scan_image_paths(root: str, exclude_dirs: Tuple[str, ...] = ()):
+    """os.scandir 기반 스트리밍 순회. 제외 디렉터리는 하위 트리째 건너뛴다(심볼릭 링크 디렉터리는 따라가지 않음)."""
+    exclude_set = frozenset(exclude_dirs)
+    exclude_prefixes = tuple(d + os.sep for d in exclude_dirs)
+    if root in exclude_set or root.startswith(exclude_prefixes):
+        return
+    stack = [root]
+    while stack:
         try:
-            pr = p.resolve()
-        except Exception:
-            pr = p
-        pr_str = str(pr)
-        for ex in exclude_roots:
-            ex_str = str(ex)
-            if pr_str.startswith(ex_str + "/") or pr_str == ex_str:
-                return True
-        return False
-
-    all_files: List[Path] = []
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.path in exclude_set or entry.path.startswith(exclude_prefixes):
+                            continue
+                        stack.append(entry.path)
+                    elif entry.name.lower().endswith(_IMAGE_EXTS) and entry.is_file():
+                        yield entry.path
+                except OSError:
+                    continue
+
+
+# 데이터셋 이미지 인덱스 (워커당 1회 구축): 경로 배열과 상위 디렉터리 id 배열을 나란히 보관
+_IMAGE_INDEX: Optional[Tuple[str, List[str], List[int], List[str]]] = None  # (root, paths, dir_ids, dir_names)
+_IMAGE_INDEX_LOCK = threading.Lock()
+_IMAGE_INDEX_BUILT_AT = 0.0  # time.monotonic() 기준
+_IMAGE_INDEX_REFRESHING = False
+
+
+def _build_image_index(root: str) -> Tuple[str, List[str], List[int], List[str]]:
+    paths: List[str] = []
+    dir_ids: List[int] = []
+    dir_names: List[str] = []
+    dir_to_id: Dict[str, int] = {}
     try:
-        for p in root.rglob('*'):
-            if not p.is_file():
-                continue
-            if p.suffix.lower() not in ('.jpg', '.jpeg', '.png', '.gif'):
-                continue
-            if _is_under_excluded(p):
-                continue
-            all_files.append(p)
-    except Exception:
-        pass
-    import random as _random
-    _random.shuffle(all_files)
-    return [str(p.resolve()) for p in all_files[:sample_size]]
+        for p in _scan_image_paths(root):
+            d = os.path.dirname(p)
+            did = dir_to_id.get(d)
+            if did is None:
+                did = dir_to_id[d] = len(dir_names)
+                dir_names.append(d)
+            paths.append(p)
+            dir_ids.append(did)
+    except Exception as e:
+        print(f"⚠️ 이미지 인덱스 구축 실패: {e}")
+    print(f"✅ 이미지 인덱스 구축: {len(paths)}개 파일, {len(dir_names)}개 디렉터리 ({root})")
+    return root, paths, dir_ids, dir_names
+
+
+@lru_cache(maxsize=4096)
+def _resolve_dir(path: str) -> str:
+    # 설정/매핑에서 오는 디렉터리 문자열은 고정이므로 realpath 결과를 캐시
+    return str(Path(path).resolve())
+
+
+# 제외 디렉터리 목록(원본 문자열 튜플) -> 인덱스 상 제외 디렉터리 id 집합. 인덱스 재구축 시 비움
+_EXCLUDED_IDS_CACHE: Dict[Tuple[str, ...], frozenset] = {}
+
+
+def _swap_image_index(index: Tuple[str, List[str], List[int], List[str]]) -> None:
+    # 락을 잡은 상태에서 호출
+    global _IMAGE_INDEX, _IMAGE_INDEX_BUILT_AT
+    _IMAGE_INDEX = index
+    _IMAGE_INDEX_BUILT_AT = time.monotonic()
+    _EXCLUDED_IDS_CACHE.clear()
+
+
+def _refresh_image_index(root: str) -> None:
+    # TTL 경과 후 백그라운드에서 재구축. 완료 전까지 요청은 기존 인덱스를 그대로 사용
+    global _IMAGE_INDEX_REFRESHING
+    try:
+        index = _build_image_index(root)
+        with _IMAGE_INDEX_LOCK:
+            if _IMAGE_INDEX is not None and _IMAGE_INDEX[0] == root:
+                _swap_image_index(index)
+    finally:
+        _IMAGE_INDEX_REFRESHING = False
+
+
+def _get_image_index(root_dir: str) -> Tuple[str, List[str], List[int], List[str]]:
+    global _IMAGE_INDEX_REFRESHING
+    root = _resolve_dir(root_dir)
+    index = _IMAGE_INDEX
+    if index is not None and index[0] == root:
+        if (
+            ABSTRACT_IMAGE_INDEX_TTL_SECONDS > 0
+            and not _IMAGE_INDEX_REFRESHING
+            and time.monotonic() - _IMAGE_INDEX_BUILT_AT >= ABSTRACT_IMAGE_INDEX_TTL_SECONDS
+        ):
+            with _IMAGE_INDEX_LOCK:
+                start = not _IMAGE_INDEX_REFRESHING
+                _IMAGE_INDEX_REFRESHING = True
+            if start:
+                try:
+                    threading.Thread(target=_refresh_image_index, args=(root,), name="image-index-refresh", daemon=True).start()
+                except Exception as e:
+                    _IMAGE_INDEX_REFRESHING = False
+                    print(f"⚠️ 이미지 인덱스 재구축 시작 실패: {e}")
+        return index
+    with _IMAGE_INDEX_LOCK:
+        if _IMAGE_INDEX is None or _IMAGE_INDEX[0] != root:
+            _swap_image_index(_build_image_index(root))
+        return _IMAGE_INDEX
+
+
+def _excluded_dir_ids(dir_names: List[str], exclude_dirs: List[str]) -> frozenset:
+    cache_key = tuple(exclude_dirs)
+    cached = _EXCLUDED_IDS_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+    exclude_roots = tuple(_resolve_dir(d) for d in exclude_dirs if d)
+    if not exclude_roots:
+        ids: frozenset = frozenset()
+    else:
+        exclude_prefixes = tuple(d + os.sep for d in exclude_roots)
+        ids = frozenset(
+            i for i, d in enumerate(dir_names)
+            if d in exclude_roots or d.startswith(exclude_prefixes)
+        )
+    # 계산 도중 인덱스가 교체됐다면 이전 인덱스 기준 결과이므로 캐시에 넣지 않음
+    with _IMAGE_INDEX_LOCK:
+        if _IMAGE_INDEX is not None and _IMAGE_INDEX[3] is dir_names:
+            _EXCLUDED_IDS_CACHE[cache_key] = ids
+    return ids
+
+
+def warm_image_index() -> None:
+    _get_image_index(ABSTRACT_IMAGE_ROOT)
+
+
+def iter_random_images_excluding(root_dir: str, exclude_dirs: Sequence[str], sample_size: int) -> List[str]:
+    _, paths, dir_ids, dir_names = _get_image_index(root_dir)
+    n = len(paths)
+    k = min(max(sample_size, 0), n)
+    if k == 0:
+        return []
+    excluded_ids = _excluded_dir_ids(dir_names, exclude_dirs)
+
+    # 제외 비율이 작으므로 인덱스 무작위 추출 + 거절 방식으로 O(k) 샘플링
+    picked: set = set()
+    out: List[str] = []
+    attempts = 0
+    while len(out) < k and attempts < k * 20:
+        attempts += 1
+        i = random.randrange(n)
+        if i in picked or dir_ids[i] in excluded_ids:
+            continue
+        picked.add(i)
+        out.append(paths[i])
+    if len(out) < k:
+        # 거절이 많으면 남은 후보 전체에서 보충
+        pool = [i for i in range(n) if i not in picked and dir_ids[i] not in excluded_ids]
+        out.extend(paths[i] for i in random.sample(pool, min(k - len(out), len(pool))))
+    return out
 
 
 _ABSTRACT_CLASS_DIR_MAPPING = _load_class_dir_map(ABSTRACT_CLASS_DIR_MAP)
@@ -173,39 +310,159 @@ _ABSTRACT_KEYWORDS_BY_CLASS = _load_keyword_map(ABSTRACT_KEYWORD_MAP)
 _ABSTRACT_FILE_KEYS_BY_CLASS = _load_file_keys_manifest_from_mongo(MONGO_URI, MONGO_DB, MONGO_MANIFEST_COLLECTION, MONGO_DOC_ID)
 
 
-def get_class_dir_mapping() -> Dict[str, List[str]]:
+def get_class_dir_mapping() -> Dict[str, Tuple[str, ...]]:
     return _ABSTRACT_CLASS_DIR_MAPPING
 
 
-def get_abstract_class_list() -> List[str]:
+def get_abstract_class_list() -> Tuple[str, ...]:
     return _ABSTRACT_CLASS_LIST
 
 
-def get_keyword_map() -> Dict[str, List[str]]:
+def get_keyword_map() -> Dict[str, Tuple[str, ...]]:
     return _ABSTRACT_KEYWORDS_BY_CLASS
 
 
-def batch_predict_prob(paths: List[str], target: str) -> List[float]:
+# 업로드 파일 읽기는 소규모 전용 스레드풀에서 병렬로 수행 (콜드 캐시에서 순차 읽기 지연 합산 방지)
+_UPLOAD_OPEN_EXECUTOR = ThreadPoolExecutor(max_workers=16, thread_name_prefix="abstract-upload")
+
+
+def _read_for_upload(path: str) -> bytes:
+    # 블로킹 read는 스레드풀에서 끝내고 이벤트 루프에는 bytes만 넘김 (httpx가 동기 파일을 루프에서 읽지 않도록)
+    with open(path, 'rb', buffering=64 * 1024) as f:
+        return f.read()
+
+
+async def _post_predict_prob(paths: List[str], target: str) -> List[float]:
+    loop = asyncio.get_running_loop()
+    contents = await asyncio.gather(
+        *(loop.run_in_executor(_UPLOAD_OPEN_EXECUTOR, _read_for_upload, p) for p in paths)
+    )
+    files = []
+    for p, data in zip(paths, contents):
+        name = os.path.basename(p)
+        mime = _EXT_MIME.get(os.path.splitext(name)[1].lower(), "image/jpeg")
+        files.append(('files', (name, data, mime)))
+    resp = await get_http_client().post(ABSTRACT_API_URL, data={"target_class": target}, files=files, timeout=30.0)
+    resp.raise_for_status()
+    probs_local = orjson.loads(resp.content).get("probs", [])
+    return [float(x) for x in probs_local]
+
+
+def _random_probs(paths: List[str]) -> List[float]:
+    return [random.random() for _ in paths]
+
+
+# 동시 요청의 확률 예측을 모아 한 번에 ML 서비스로 보내는 배처 (startup에서 시작)
+_PROB_QUEUE: Optional["asyncio.Queue[Tuple[List[str], str, asyncio.Future]]"] = None
+_PROB_BATCH_TASK: Optional[asyncio.Task] = None
+_PROB_FLUSH_TASKS: set = set()  # 전송 중인 태스크 참조 유지 (GC 방지)
+
+
+async def _predict_prob_single(paths: List[str], target: str) -> List[float]:
+    # 요청 1건 단위 호출: 실패해도 해당 요청만 무작위 확률로 폴백
     try:
-        files = []
-        preview_names = [Path(p).name for p in paths[:5]]
-        start_ts = time.time()
-        for p in paths:
-            files.append(('files', (Path(p).name, open(p, 'rb'), mimetypes.guess_type(p)[0] or 'image/jpeg')))
-        data = {"target_class": target}
-        with httpx.Client(timeout=30.0) as client:
-            resp = client.post(ABSTRACT_API_URL, data=data, files=files)
-            resp.raise_for_status()
-            probs_local = resp.json().get("probs", [])
-        for _, f in files:
-            try:
-                f[1].close()
-            except Exception:
-                pass
-        return [float(x) for x in probs_local]
-    except Exception:
-        import random as _random
-        return [_random.random() for _ in paths]
+        probs = await _post_predict_prob(paths, target)
+        if len(probs) != len(paths):
+            raise ValueError(f"probs length mismatch: {len(probs)} != {len(paths)}")
+        return probs
+    except Exception as e:
+        print(f"⚠️ abstract 확률 호출 실패(무작위 폴백): {e}")
+        return _random_probs(paths)
+
+
+async def _flush_prob_group(target: str, items: List[Tuple[List[str], str, asyncio.Future]]) -> None:
+    results: Optional[List[List[float]]] = None
+    if len(items) > 1:
+        all_paths: List[str] = []
+        for paths, _, _ in items:
+            all_paths.extend(paths)
+        try:
+            probs = await _post_predict_prob(all_paths, target)
+            if len(probs) != len(all_paths):
+                raise ValueError(f"probs length mismatch: {len(probs)} != {len(all_paths)}")
+            results = []
+            offset = 0
+            for paths, _, _ in items:
+                results.append(probs[offset:offset + len(paths)])
+                offset += len(paths)
+        except Exception as e:
+            print(f"⚠️ abstract 확률 배치 호출 실패(요청별 재시도): {e}")
+    if results is None:
+        # 묶음 호출 실패(파일 하나 누락 등)가 다른 요청까지 무작위 폴백시키지 않도록 요청별로 다시 호출
+        results = await asyncio.gather(*(_predict_prob_single(paths, target) for paths, _, _ in items))
+    for (_, _, fut), probs_item in zip(items, results):
+        if not fut.done():
+            fut.set_result(probs_item)
+
+
+async def _prob_batch_loop(queue: "asyncio.Queue[Tuple[List[str], str, asyncio.Future]]") -> None:
+    loop = asyncio.get_running_loop()
+    max_delay = ABSTRACT_BATCH_MAX_DELAY_MS / 1000.0
+    while True:
+        items = [await queue.get()]
+        deadline = loop.time() + max_delay
+        # 첫 항목 이후 큐가 비어 있으면(동시 요청 없음) 대기 없이 바로 전송해 단독 요청에 지연을 더하지 않음
+        while len(items) < ABSTRACT_BATCH_MAX_SIZE and not queue.empty():
+            items.append(queue.get_nowait())
+        try:
+            while len(items) > 1 and len(items) < ABSTRACT_BATCH_MAX_SIZE:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    items.append(await asyncio.wait_for(queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+        except asyncio.CancelledError:
+            # 종료 중 모으던 요청도 매달리지 않도록 예외로 끝냄
+            for _, _, fut in items:
+                if not fut.done():
+                    fut.set_exception(RuntimeError("abstract probability batcher stopped"))
+            raise
+        # ML 엔드포인트는 요청당 target_class 하나만 받으므로 클래스별로 묶어 전송
+        groups: Dict[str, List[Tuple[List[str], str, asyncio.Future]]] = {}
+        for item in items:
+            groups.setdefault(item[1], []).append(item)
+        for target, group in groups.items():
+            task = asyncio.create_task(_flush_prob_group(target, group))
+            _PROB_FLUSH_TASKS.add(task)
+            task.add_done_callback(_PROB_FLUSH_TASKS.discard)
+
+
+def start_prob_batcher() -> None:
+    global _PROB_QUEUE, _PROB_BATCH_TASK
+    if _PROB_BATCH_TASK is not None and not _PROB_BATCH_TASK.done():
+        return
+    _PROB_QUEUE = asyncio.Queue()
+    _PROB_BATCH_TASK = asyncio.create_task(_prob_batch_loop(_PROB_QUEUE))
+
+
+async def stop_prob_batcher() -> None:
+    global _PROB_QUEUE, _PROB_BATCH_TASK
+    task, _PROB_BATCH_TASK = _PROB_BATCH_TASK, None
+    queue, _PROB_QUEUE = _PROB_QUEUE, None
+    # 아직 전송되지 않은 요청은 클라이언트 타임아웃까지 매달려 있지 않도록 예외로 종료
+    while queue is not None and not queue.empty():
+        _, _, fut = queue.get_nowait()
+        if not fut.done():
+            fut.set_exception(RuntimeError("abstract probability batcher stopped"))
+    if task is None:
+        return
+    task.cancel()
+    try:
+        await task
+    except (asyncio.CancelledError, Exception):
+        pass
+
+
+async def batch_predict_prob(paths: List[str], target: str) -> List[float]:
+    queue = _PROB_QUEUE
+    if queue is None or ABSTRACT_BATCH_MAX_SIZE <= 1:
+        # 배처 미기동(또는 비활성) 시 단건 호출
+        return await _predict_prob_single(paths, target)
+    fut = asyncio.get_running_loop().create_future()
+    await queue.put((paths, target, fut))
+    return await fut
 
 
 def get_file_keys_by_class(target_class: str) -> List[str]:
@@ -221,16 +478,93 @@ def get_other_class_keys(target_class: str) -> List[str]:
     return keys
 
 
+# 이미지 루트는 고정 설정이므로 import 시 한 번만 resolve 하고, 이후에는 문자열 접두사 비교만 수행
+_ABSTRACT_IMAGE_ROOT_PREFIX = os.path.join(_resolve_dir(ABSTRACT_IMAGE_ROOT), "")
+
+
 def map_local_to_key(local_path: str) -> Optional[str]:
+    # 후보 경로는 resolve된 루트 아래에서 인덱싱된 경로이므로 realpath 없이 정규화 + 접두사 절단으로 충분
     try:
-        root = Path(ABSTRACT_IMAGE_ROOT).resolve()
-        p = Path(local_path).resolve()
-        rel = p.relative_to(root)
+        p = os.path.abspath(local_path)
     except Exception:
         return None
-    return str(rel).replace(os.sep, "/").lstrip("/")
+    if not p.startswith(_ABSTRACT_IMAGE_ROOT_PREFIX):
+        return None
+    return p[len(_ABSTRACT_IMAGE_ROOT_PREFIX):].replace(os.sep, "/")
+
+
+def verify_request_credentials(
+    x_api_key: Optional[str],
+    x_secret_key: Optional[str],
+    captcha_token: Optional[str],
+) -> Dict[str, Any]:
+    # 동기 DB 조회(API 키/캡차 토큰)를 묶어 스레드풀에서 한 번에 실행
+    if not x_api_key:
+        raise HTTPException(status_code=401, detail="API key required")
+    
+    # 데모 키 하드코딩 (홈페이지 데모용)
+    DEMO_PUBLIC_KEY = 'rc_live_f49a055d62283fd02e8203ccaba70fc2'
+    
+    if x_api_key == DEMO_PUBLIC_KEY:
+        # 데모 키: 공개키만으로 검증 (브라우저에서 직접 호출)
+        from database import verify_api_key_auto_secret
+        api_key_info = verify_api_key_auto_secret(x_api_key)
+        if not api_key_info or not api_key_info.get('is_demo'):
+            raise HTTPException(status_code=401, detail="Invalid demo API key")
+        print(f"🎯 데모 모드 캡차 검증: {DEMO_PUBLIC_KEY} 사용")
+        
+        # 데모 키도 실제 캡차 검증 진행
+    else:
+        # 일반 키: 공개키+비밀키 검증 (사용자 서버에서 호출)
+        if not x_secret_key:
+            raise HTTPException(status_code=401, detail="Secret key required for non-demo keys")
+        
+        from database import verify_api_key_with_secret
+        api_key_info = verify_api_key_with_secret(x_api_key, x_secret_key)
+        if not api_key_info:
+            raise HTTPException(status_code=401, detail="Invalid API key or secret key")
+        print(f"🔒 일반 모드 캡차 검증: {x_api_key[:20]}... 사용")
+    
+    # 캡차 토큰 검증
+    if not captcha_token:
+        raise HTTPException(status_code=400, detail="Captcha token required")
+    
+    from database import verify_captcha_token
+    token_valid = verify_captcha_token(captcha_token, api_key_info['api_key_id'])
+    if not token_valid:
+        raise HTTPException(status_code=400, detail="Invalid or expired captcha token")
+    return api_key_info
+
+
+def log_verify_request(x_api_key: str, status_code: int, start_time: float, path: str, api_type: str) -> None:
+    # 중복 방지를 위해 request_logs에만 기록 (실패해도 응답에는 영향 없음)
+    try:
+        user_id = None
+        try:
+            from database import get_db_cursor
+            with get_db_cursor(dict_rows=False) as cursor:
+                cursor.execute("""
+                    SELECT user_id FROM api_keys WHERE key_id = %s LIMIT 1
+                """, (x_api_key,))
+                row = cursor.fetchone()
+                if row and (row[0] is not None):
+                    user_id = int(row[0])
+        except Exception:
+            user_id = None
+
+        from database import log_request_to_request_logs
+        log_request_to_request_logs(
+            user_id=user_id or 0,
+            api_key=x_api_key,
+            path=path,
+            api_type=api_type,
+            method="POST",
+            status_code=status_code,
+            response_time=int((time.time() - start_time) * 1000),
+            user_agent=None
+        )
+    except Exception:
+        pass
 
 
 from .routers_utils_shared import get_handwriting_state  # re-export if exists
-
-
@@ -8,9 +8,11 @@ load_dotenv()
 
 # General
 ENV = os.getenv("APP_ENV", "development")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()  # DEBUG로 설정하면 요청별 상세 로그 출력
 
 # Captcha TTL
 CAPTCHA_TTL = int(os.getenv("CAPTCHA_TTL", "60"))
+SESSION_SWEEP_INTERVAL_SECONDS = float(os.getenv("SESSION_SWEEP_INTERVAL_SECONDS", "60"))  # 0이면 주기 청소 안 함
 
 # Redis configuration
 USE_REDIS = os.getenv("USE_REDIS", "false").lower() == "true"
@@ -21,6 +23,14 @@ REDIS_PASSWORD = os.getenv("REDIS_PASSWORD")
 REDIS_SSL = os.getenv("REDIS_SSL", "false").lower() == "true"
 REDIS_PREFIX = os.getenv("REDIS_PREFIX", "rcaptcha:")
 REDIS_TIMEOUT_MS = int(os.getenv("REDIS_TIMEOUT_MS", "2000"))
+REDIS_RETRY_INTERVAL_SECONDS = int(os.getenv("REDIS_RETRY_INTERVAL_SECONDS", "30"))
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "64"))  # 노드당 최대 연결 수 (스레드풀 40개보다 크게 유지)
+REDIS_HEALTH_CHECK_INTERVAL = int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL", "30"))
+# 레플리카 읽기는 복제 지연으로 삭제된 1회용 챌린지/차단 세션이 다시 보일 수 있어 기본 비활성
+REDIS_READ_FROM_REPLICAS = os.getenv("REDIS_READ_FROM_REPLICAS", "false").lower() == "true"
+
+# CORS (쉼표로 구분된 Origin 목록, 기본값 "*")
+CORS_ALLOW_ORIGINS = [o.strip() for o in os.getenv("CORS_ALLOW_ORIGINS", "*").split(",") if o.strip()]
 
 # Database configuration for API key validation
 DB_HOST = os.getenv("DB_HOST", "localhost")
@@ -34,6 +44,11 @@ ML_SERVICE_URL = os.getenv("ML_SERVICE_URL", "http://localhost:8001")
 ML_PREDICT_BOT_URL = f"{ML_SERVICE_URL.rstrip('/')}" + "/predict-bot"
 ABSTRACT_API_URL = f"{ML_SERVICE_URL.rstrip('/')}" + "/predict-abstract-proba-batch"
 PREDICT_IMAGE_URL = f"{ML_SERVICE_URL.rstrip('/')}" + "/predict-image"
+ML_HTTP_TIMEOUT_SECONDS = float(os.getenv("ML_HTTP_TIMEOUT_SECONDS", "15"))
+ML_HTTP_MAX_CONNECTIONS = int(os.getenv("ML_HTTP_MAX_CONNECTIONS", "200"))
+ML_HTTP_MAX_KEEPALIVE = int(os.getenv("ML_HTTP_MAX_KEEPALIVE", "100"))
+ML_HTTP_RETRIES = int(os.getenv("ML_HTTP_RETRIES", "1"))  # 연결 실패 시에만 재시도
+ML_HTTP2 = os.getenv("ML_HTTP2", "false").lower() == "true"  # h2 패키지가 설치된 경우에만 적용
 
 # HMAC secret and paths
 ABSTRACT_HMAC_SECRET = os.getenv("ABSTRACT_HMAC_SECRET", "change-this-secret")
@@ -42,6 +57,9 @@ WORD_LIST_PATH = os.getenv("WORD_LIST_PATH", str(Path(__file__).resolve().parent
 ABSTRACT_IMAGE_ROOT = os.getenv("ABSTRACT_IMAGE_ROOT", str(Path(__file__).resolve().parents[2] / "abstractcaptcha"))
 ABSTRACT_CLASS_DIR_MAP = os.getenv("ABSTRACT_CLASS_DIR_MAP", str(Path(__file__).resolve().parent.parent / "abstract_class_dir_map.json"))
 ABSTRACT_CLASS_SOURCE = os.getenv("ABSTRACT_CLASS_SOURCE", "local").lower()
+ABSTRACT_BATCH_MAX_SIZE = int(os.getenv("ABSTRACT_BATCH_MAX_SIZE", "8"))  # 한 번에 묶는 최대 요청 수 (1이면 비활성)
+ABSTRACT_BATCH_MAX_DELAY_MS = int(os.getenv("ABSTRACT_BATCH_MAX_DELAY_MS", "50"))
+ABSTRACT_IMAGE_INDEX_TTL_SECONDS = int(os.getenv("ABSTRACT_IMAGE_INDEX_TTL_SECONDS", "300"))  # 0이면 재구축 안 함
 ABSTRACT_KEYWORD_MAP = os.getenv("ABSTRACT_KEYWORD_MAP", str(Path(__file__).resolve().parent.parent / "abstract_keyword_map.json"))
 
 # Handwriting/OCR
@@ -49,6 +67,10 @@ HANDWRITING_MANIFEST_PATH = os.getenv("HANDWRITING_MANIFEST_PATH", "handwriting_
 SUCCESS_REDIRECT_URL = os.getenv("SUCCESS_REDIRECT_URL")
 OCR_API_URL = f"{ML_SERVICE_URL.rstrip('/')}" + "/predict-text"
 OCR_IMAGE_FIELD = os.getenv("OCR_IMAGE_FIELD")
+# 동시 OCR 요청을 한 번의 멀티파트 호출로 묶는 배치 엔드포인트 (미설정 시 단건 호출만 사용)
+OCR_BATCH_API_URL = os.getenv("OCR_BATCH_API_URL")
+OCR_BATCH_MAX_SIZE = int(os.getenv("OCR_BATCH_MAX_SIZE", "8"))  # 한 번에 묶는 최대 이미지 수 (1이면 비활성)
+OCR_BATCH_MAX_DELAY_MS = int(os.getenv("OCR_BATCH_MAX_DELAY_MS", "25"))
 DEBUG_SAVE_OCR_UPLOADS = os.getenv("DEBUG_SAVE_OCR_UPLOADS", "false").lower() == "true"
 DEBUG_OCR_DIR = os.getenv("DEBUG_OCR_DIR", "debug_uploads")
 DEBUG_ABSTRACT_VERIFY = os.getenv("DEBUG_ABSTRACT_VERIFY", "false").lower() == "true"
@@ -28,12 +28,14 @@ def get_db_connection():
             connection.close()
 
 @contextmanager
-def get_db_cursor():
+def get_db_cursor(dict_rows: bool = True):
     """
     기존 코드와의 호환성을 위한 데이터베이스 커서 컨텍스트 매니저
+    dict_rows=False이면 행마다 dict를 만들지 않는 튜플 커서를 사용 (단일 컬럼 조회용)
     """
+    cursor_class = pymysql.cursors.DictCursor if dict_rows else pymysql.cursors.Cursor
     with get_db_connection() as conn:
-        with conn.cursor(pymysql.cursors.DictCursor) as cursor:
+        with conn.cursor(cursor_class) as cursor:
             yield cursor
 
 def test_connection():
@@ -1,5 +1,5 @@
-from dataclasses import dataclass
-from typing import List, Dict
+from dataclasses import dataclass, field
+from typing import FrozenSet, List, Dict, Optional
 import time
 
 
@@ -24,6 +24,8 @@ class AbstractCaptchaSession:
         self.created_at = created_at
         self.attempts = 0
         self.is_remote = is_remote
+        # 검증 시 매번 enumerate하지 않도록 정답 인덱스를 비트마스크(i번째 비트 = i번 이미지)로 1회 계산
+        self.positive_mask = sum(1 << i for i, flag in enumerate(is_positive) if flag)
 
     def is_expired(self) -> bool:
         return (time.time() - self.created_at) > self.ttl_seconds
@@ -38,5 +40,58 @@ class ImageGridCaptchaSession:
     target_label: str
     correct_cells: List[int]
     attempts: int = 0
+    # 검증 시 매번 정렬·중복 제거하지 않도록 정답 셀 집합을 생성 시 1회 계산
+    correct_set: FrozenSet[int] = field(init=False, repr=False)
 
+    def __post_init__(self) -> None:
+        self.correct_set = frozenset(int(x) for x in (self.correct_cells or ()))
 
+
+@dataclass
+class CheckboxSession:
+    """체크박스 세션 (Redis HASH 한 건과 1:1 대응)"""
+    session_id: str
+    attempts: int = 0
+    low_score_attempts: int = 0  # 봇 의심 시도 횟수
+    is_blocked: bool = False
+    created_at: int = 0  # epoch milliseconds
+    last_attempt_at: Optional[int] = None  # epoch milliseconds
+    ttl: int = 300  # 생성 시 지정된 TTL (갱신 시 기본값으로 재사용)
+
+    def to_mapping(self) -> Dict[str, object]:
+        """HSET mapping 형태로 변환 (bool은 0/1, 값이 없는 필드는 생략)"""
+        mapping = {
+            "session_id": self.session_id,
+            "attempts": self.attempts,
+            "low_score_attempts": self.low_score_attempts,
+            "is_blocked": 1 if self.is_blocked else 0,
+            "created_at": self.created_at,
+            "ttl": self.ttl,
+        }
+        if self.last_attempt_at is not None:
+            mapping["last_attempt_at"] = self.last_attempt_at
+        return mapping
+
+    @classmethod
+    def from_hash(cls, session_id: str, data: Dict[str, object]) -> "CheckboxSession":
+        """디코딩된 HGETALL 결과로부터 생성"""
+        def _int(value) -> int:
+            try:
+                return int(value)
+            except (TypeError, ValueError):
+                pass
+            try:
+                return int(float(value))  # 이전 float 초 단위 값 호환
+            except (TypeError, ValueError):
+                return 0
+
+        last_attempt_at = data.get("last_attempt_at")
+        return cls(
+            session_id=session_id,
+            attempts=_int(data.get("attempts")),
+            low_score_attempts=_int(data.get("low_score_attempts")),
+            is_blocked=_int(data.get("is_blocked")) == 1,
+            created_at=_int(data.get("created_at")),
+            last_attempt_at=_int(last_attempt_at) if last_attempt_at else None,
+            ttl=_int(data.get("ttl")) or 300,
+        )
@@ -0,0 +1,50 @@
+from typing import Optional
+
+import httpx
+
+try:
+    import h2  # noqa: F401  # httpx의 HTTP/2 지원에 필요 (선택 의존성)
+except Exception:
+    h2 = None
+
+from config.settings import (
+    ML_HTTP_TIMEOUT_SECONDS,
+    ML_HTTP_MAX_CONNECTIONS,
+    ML_HTTP_MAX_KEEPALIVE,
+    ML_HTTP_RETRIES,
+    ML_HTTP2,
+)
+
+
+# ML 서비스 호출용 공유 AsyncClient (워커당 1개, 커넥션 풀 재사용)
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is not None and not _http_client.is_closed:
+        return _http_client
+    limits = httpx.Limits(
+        max_connections=ML_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=ML_HTTP_MAX_KEEPALIVE,
+    )
+    use_http2 = ML_HTTP2 and h2 is not None
+    if ML_HTTP2 and not use_http2:
+        print("⚠️ ML_HTTP2=true 이지만 h2 패키지가 없어 HTTP/1.1 keep-alive로 동작합니다")
+    # 타임아웃/재시도는 클라이언트 단에서 한 번만 설정 (transport 지정 시 limits는 transport에 전달)
+    _http_client = httpx.AsyncClient(
+        timeout=httpx.Timeout(ML_HTTP_TIMEOUT_SECONDS),
+        transport=httpx.AsyncHTTPTransport(limits=limits, retries=ML_HTTP_RETRIES, http2=use_http2),
+    )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    global _http_client
+    client, _http_client = _http_client, None
+    if client is None:
+        return
+    try:
+        await client.aclose()
+    except Exception as e:
+        print(f"⚠️ HTTP 클라이언트 종료 실패: {e}")
@@ -0,0 +1,39 @@
+from typing import Optional
+import logging
+import logging.handlers
+import queue
+
+
+# 루트 로거에는 QueueHandler만 달고, 실제 출력(stderr 쓰기)은 리스너 스레드에서 수행해 워커 스레드가 I/O를 기다리지 않게 함
+_LOG_LISTENER: Optional[logging.handlers.QueueListener] = None
+
+
+def start_log_listener(level: str = "INFO") -> None:
+    global _LOG_LISTENER
+    if _LOG_LISTENER is not None:
+        return
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+    stream = logging.StreamHandler()
+    stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    root = logging.getLogger()
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    try:
+        root.setLevel(level)
+    except ValueError:
+        print(f"⚠️ 알 수 없는 LOG_LEVEL: {level} (INFO 사용)")
+        root.setLevel(logging.INFO)
+    _LOG_LISTENER = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=True)
+    _LOG_LISTENER.start()
+
+
+def stop_log_listener() -> None:
+    global _LOG_LISTENER
+    listener = _LOG_LISTENER
+    if listener is None:
+        return
+    _LOG_LISTENER = None
+    try:
+        # 큐에 남은 레코드를 모두 출력한 뒤 종료
+        listener.stop()
+    except Exception as e:
+        print(f"⚠️ 로그 리스너 종료 실패: {e}")
@@ -0,0 +1,43 @@
+from typing import Any, Dict, Optional
+import threading
+
+
+# URI별 공유 MongoClient (MongoClient는 자체 커넥션 풀을 가진 thread-safe 객체이므로 프로세스당 1개만 사용)
+_MONGO_CLIENTS: Dict[str, Any] = {}
+_MONGO_CLIENTS_LOCK = threading.Lock()
+
+
+def get_mongo_client(uri: str) -> Optional[Any]:
+    if not uri:
+        return None
+    client = _MONGO_CLIENTS.get(uri)
+    if client is not None:
+        return client
+    with _MONGO_CLIENTS_LOCK:
+        client = _MONGO_CLIENTS.get(uri)
+        if client is not None:
+            return client
+        try:
+            from pymongo import MongoClient  # type: ignore
+        except Exception as e:
+            print(f"⚠️ pymongo not available: {e}")
+            return None
+        try:
+            # 연결은 첫 명령 시점에 맺어지므로 생성 자체는 블로킹하지 않음
+            client = MongoClient(uri, serverSelectionTimeoutMS=3000)
+        except Exception as e:
+            print(f"⚠️ MongoClient 생성 실패: {e}")
+            return None
+        _MONGO_CLIENTS[uri] = client
+        return client
+
+
+def close_mongo_clients() -> None:
+    with _MONGO_CLIENTS_LOCK:
+        clients = list(_MONGO_CLIENTS.values())
+        _MONGO_CLIENTS.clear()
+    for client in clients:
+        try:
+            client.close()
+        except Exception as e:
+            print(f"⚠️ MongoClient 종료 실패: {e}")
@@ -0,0 +1,94 @@
+from typing import Any, Dict, List, Optional, Tuple
+import queue
+import threading
+import time
+
+
+class MongoBatchWriter:
+    """요청 경로에서는 큐에 넣기만 하고, 단일 워커 스레드가 모아서 insert_many로 저장.
+
+    큐가 가득 차면 문서를 버리고 dropped 카운터만 올린다 (행동 데이터 저장은 best-effort).
+    """
+
+    def __init__(self, maxsize: int = 10_000, batch_size: int = 200, max_delay: float = 0.5):
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.dropped = 0
+        self._queue: "queue.Queue[Optional[Tuple[Any, str, str, Dict[str, Any]]]]" = queue.Queue(maxsize=maxsize)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="mongo-batch-writer", daemon=True)
+                self._thread.start()
+
+    def enqueue(self, client: Any, db: str, collection: str, doc: Dict[str, Any]) -> bool:
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((client, db, collection, doc))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _collect(self) -> Tuple[List[Tuple[Any, str, str, Dict[str, Any]]], bool]:
+        # 첫 항목은 블로킹으로 기다리고, 이후 batch_size 또는 max_delay까지 모음
+        item = self._queue.get()
+        if item is None:
+            return [], True
+        batch = [item]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _flush(self, batch: List[Tuple[Any, str, str, Dict[str, Any]]]) -> None:
+        groups: Dict[Tuple[int, str, str], Tuple[Any, List[Dict[str, Any]]]] = {}
+        for client, db, collection, doc in batch:
+            key = (id(client), db, collection)
+            if key not in groups:
+                groups[key] = (client, [])
+            groups[key][1].append(doc)
+        for (_, db, collection), (client, docs) in groups.items():
+            try:
+                # ordered=False: 한 문서 실패(중복 _id 등)가 나머지 저장을 막지 않음
+                client[db][collection].insert_many(docs, ordered=False)
+            except Exception as e:
+                print(f"⚠️ Mongo 배치 저장 실패 ({db}.{collection}, {len(docs)}건): {e}")
+
+    def _run(self) -> None:
+        while True:
+            batch, stop = self._collect()
+            if batch:
+                self._flush(batch)
+            if stop:
+                return
+
+    def close(self, timeout: float = 5.0) -> None:
+        """남은 문서를 저장하고 워커 종료 (셧다운 시 호출)."""
+        thread = self._thread
+        if thread is None:
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        thread.join(timeout)
+        with self._lock:
+            self._thread = None
+
+
+BEHAVIOR_WRITER = MongoBatchWriter()
@@ -1,12 +1,29 @@
 import json as _json
+import socket
+import sys
+import threading
 import time
-from typing import Union
+from dataclasses import asdict
+from functools import lru_cache
+from typing import Optional, Union
 
 try:
     from redis.cluster import RedisCluster  # type: ignore
+    from redis.backoff import ExponentialBackoff  # type: ignore
+    from redis.retry import Retry  # type: ignore
+    from redis.exceptions import ConnectionError as RedisConnectionError  # type: ignore
 except Exception:
     RedisCluster = None  # type: ignore
+    RedisConnectionError = None  # type: ignore
+    ExponentialBackoff = None  # type: ignore
+    Retry = None  # type: ignore
 
+try:
+    import orjson  # type: ignore
+except Exception:
+    orjson = None  # type: ignore
+
+from domain.models import CheckboxSession
 from config.settings import (
     USE_REDIS,
     REDIS_HOST,
@@ -15,98 +32,297 @@ from config.settings import (
     REDIS_SSL,
     REDIS_PREFIX,
     REDIS_TIMEOUT_MS,
+    REDIS_RETRY_INTERVAL_SECONDS,
+    REDIS_MAX_CONNECTIONS,
+    REDIS_HEALTH_CHECK_INTERVAL,
+    REDIS_READ_FROM_REPLICAS,
+    CAPTCHA_TTL,
 )
 
+# NAT/LB 뒤에서 유휴 연결이 조용히 끊기지 않도록 TCP keepalive 설정 (리눅스 옵션만 존재 시 적용)
+_KEEPALIVE_OPTIONS = {
+    opt: val
+    for opt, val in (
+        (getattr(socket, "TCP_KEEPIDLE", None), 30),
+        (getattr(socket, "TCP_KEEPINTVL", None), 10),
+        (getattr(socket, "TCP_KEEPCNT", None), 3),
+    )
+    if opt is not None
+}
+
 _redis_client = None
+_redis_init_failed_at = None  # 마지막 연결 실패 시각 (실패 후 재시도 간격 동안은 즉시 None 반환)
+_redis_lock = threading.Lock()
 
 
 def get_redis():
-    global _redis_client
-    if _redis_client is not None:
-        return _redis_client
+    global _redis_client, _redis_init_failed_at
+    client = _redis_client
+    if client is not None:
+        return client
     if not USE_REDIS:
         return None
     if RedisCluster is None:
         return None
-    try:
-        client = RedisCluster(
-            host=REDIS_HOST,
-            port=REDIS_PORT,
-            password=REDIS_PASSWORD,
-            ssl=REDIS_SSL,
-            decode_responses=True,
-            socket_connect_timeout=REDIS_TIMEOUT_MS / 1000.0,
-            socket_timeout=REDIS_TIMEOUT_MS / 1000.0,
-        )
-        client.ping()
-        _redis_client = client
-        return _redis_client
-    except Exception:
-        _redis_client = None
+    failed_at = _redis_init_failed_at
+    if failed_at is not None and (time.monotonic() - failed_at) < REDIS_RETRY_INTERVAL_SECONDS:
         return None
+    with _redis_lock:
+        # 락 대기 중 다른 스레드가 먼저 초기화/실패 처리했는지 재확인
+        if _redis_client is not None:
+            return _redis_client
+        failed_at = _redis_init_failed_at
+        if failed_at is not None and (time.monotonic() - failed_at) < REDIS_RETRY_INTERVAL_SECONDS:
+            return None
+        try:
+            client = RedisCluster(
+                host=REDIS_HOST,
+                port=REDIS_PORT,
+                password=REDIS_PASSWORD,
+                ssl=REDIS_SSL,
+                decode_responses=False,  # bytes 그대로 수신 (필요한 곳에서만 디코딩)
+                socket_connect_timeout=REDIS_TIMEOUT_MS / 1000.0,
+                socket_timeout=REDIS_TIMEOUT_MS / 1000.0,
+                max_connections=REDIS_MAX_CONNECTIONS,
+                socket_keepalive=True,
+                socket_keepalive_options=_KEEPALIVE_OPTIONS,
+                health_check_interval=REDIS_HEALTH_CHECK_INTERVAL,
+                retry_on_timeout=True,
+                retry=Retry(ExponentialBackoff(cap=0.1, base=0.01), 3),
+                # 활성화 시 일반 읽기는 레플리카로 분산 (쓰기/Lua와 _read_primary 경유 읽기는 항상 primary)
+                read_from_replicas=REDIS_READ_FROM_REPLICAS,
+            )
+            # ping 생략: 클러스터 슬롯 조회로 이미 연결이 확인되며, 상태 확인은 startup에서 1회 수행
+            _redis_client = client
+            _redis_init_failed_at = None
+            return _redis_client
+        except Exception as e:
+            print(f"⚠️ Redis 연결 실패 ({REDIS_RETRY_INTERVAL_SECONDS}s 후 재시도): {e}")
+            _redis_client = None
+            _redis_init_failed_at = time.monotonic()
+            return None
+
+
+def reset_redis(client=None) -> None:
+    """연결 오류가 난 클라이언트를 버려 다음 요청에서 새로 생성되도록 합니다 (버린 클라이언트의 소켓은 닫음)."""
+    global _redis_client
+    with _redis_lock:
+        old = _redis_client
+        if old is None or (client is not None and old is not client):
+            # 이미 다른 스레드가 교체했으면 현재 클라이언트를 건드리지 않음
+            return
+        _redis_client = None
+    try:
+        old.close()
+    except Exception as e:
+        print(f"⚠️ Redis 클라이언트 종료 실패: {e}")
+
+
+def _is_pool_exhausted(e: Exception) -> bool:
+    # redis-py ConnectionPool은 max_connections 초과 시 ConnectionError("Too many connections")를 던짐
+    # 서버 연결 문제가 아니므로 클라이언트를 재생성하면 안 됨
+    return "Too many connections" in str(e)
+
+
+def _on_redis_error(r, e: Exception) -> None:
+    if RedisConnectionError is not None and isinstance(e, RedisConnectionError):
+        if _is_pool_exhausted(e):
+            print(f"⚠️ Redis 연결 풀 고갈 (REDIS_MAX_CONNECTIONS={REDIS_MAX_CONNECTIONS}): {e}")
+            return
+        print(f"⚠️ Redis 연결 오류, 클라이언트 재생성 예정: {e}")
+        reset_redis(r)
+
+
+_PREFIX = sys.intern(REDIS_PREFIX)
+
+
+@lru_cache(maxsize=8192)
+def _rkey_cached(parts: tuple) -> str:
+    return _PREFIX + ":".join(p.strip(":") for p in parts if p)
 
 
 def rkey(*parts: str) -> str:
-    return REDIS_PREFIX + ":".join([p.strip(":") for p in parts if p])
+    # 같은 키(레이트리밋 분 단위 키, 세션 키 등)가 반복 생성되므로 조합 결과를 캐시
+    return _rkey_cached(parts)
 
 
-def redis_set_json(key: str, value: dict, ttl: int):
-    r = get_redis()
-    if not r:
-        return False
-    data = _json.dumps(value, ensure_ascii=False)
+_CHECKBOX_PREFIX = sys.intern(_PREFIX + "checkbox_session:")
+
+
+def _checkbox_key(session_id: str) -> str:
+    # 체크박스 세션 키는 prefix가 고정이므로 rkey의 가변 인자/strip 경로를 건너뜀
+    return _CHECKBOX_PREFIX + session_id
+
+
+def _dumps(value) -> Union[bytes, str]:
+    # orjson은 UTF-8 bytes를 바로 반환하므로 전송 전 재인코딩이 없음
+    if orjson is not None:
+        return orjson.dumps(value)
+    return _json.dumps(value, ensure_ascii=False)
+
+
+def _loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return _json.loads(data)
+
+
+def _redis_set_json_with(r, key: str, value: dict, ttl: int):
+    # 이미 확보한 클라이언트(또는 pipeline)를 그대로 사용
     try:
-        return r.setex(key, ttl, data)
-    except Exception:
+        return r.setex(key, ttl, _dumps(value))
+    except Exception as e:
+        _on_redis_error(r, e)
         return False
 
 
-def redis_get_json(key: str):
-    r = get_redis()
-    if not r:
-        return None
+def _read_primary(r, command: str, key: str, *args):
+    """일관성이 필요한 읽기(검증용 챌린지 문서, 체크박스 세션/차단 여부)는 레플리카 읽기가 켜져 있어도 primary에서 수행."""
+    if REDIS_READ_FROM_REPLICAS and hasattr(r, "get_node_from_key"):
+        return r.execute_command(command, key, *args, target_nodes=r.get_node_from_key(key))
+    return r.execute_command(command, key, *args)
+
+
+def _redis_get_json_with(r, key: str):
     try:
-        data = r.get(key)
-    except Exception:
+        data = _read_primary(r, "GET", key)
+    except Exception as e:
+        _on_redis_error(r, e)
         data = None
     if not data:
         return None
     try:
-        return _json.loads(data)
+        return _loads(data)
     except Exception:
         return None
 
 
-def redis_del(key: str):
+def redis_set_json(key: str, value: dict, ttl: int):
+    r = get_redis()
+    if not r:
+        return False
+    return _redis_set_json_with(r, key, value, ttl)
+
+
+def redis_get_json(key: str):
     r = get_redis()
     if not r:
+        return None
+    return _redis_get_json_with(r, key)
+
+
+def redis_del(*keys: str):
+    r = get_redis()
+    if not r or not keys:
         return 0
     try:
-        return r.delete(key)
-    except Exception:
+        return r.delete(*keys)
+    except Exception as e:
+        _on_redis_error(r, e)
         return 0
 
 
+def _counter_key(key: str) -> str:
+    # 챌린지 문서(JSON 문자열)와 별도로 시도 횟수를 HASH 카운터 키에 보관
+    return key + ":counters"
+
+
+def redis_del_challenge(key: str):
+    """챌린지 문서와 시도 횟수 카운터 키를 함께 삭제 (검증 후 카운터 키가 TTL까지 남지 않도록)."""
+    return redis_del(key, _counter_key(key))
+
+
+def _decode_hash(raw) -> dict:
+    # decode_responses=False이므로 HASH 필드명/문자열 값만 로컬에서 디코딩
+    return {
+        (k.decode() if isinstance(k, bytes) else k): v
+        for k, v in raw.items()
+    }
+
+
+def _now_ms() -> int:
+    # 워커/프로세스 간 비교가 필요하므로 monotonic 대신 wall-clock 기준 정수 밀리초 사용
+    return time.time_ns() // 1_000_000
+
+
+def _to_int(value, default: int = 0) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
 def redis_incr_attempts(key: str, field: str = "attempts", ttl: Union[int, None] = None) -> int:
     r = get_redis()
     if not r:
         return -1
     try:
-        # simple JSON get/modify/setex as in current codebase
-        val = redis_get_json(key) or {}
-        cur = int(val.get(field, 0)) + 1
-        val[field] = cur
         if ttl is None:
-            try:
-                remain = r.ttl(key)
-                ttl = int(remain) if isinstance(remain, int) and remain > 0 else 60
-            except Exception:
-                ttl = 60
-        redis_set_json(key, val, ttl)
-        return cur
-    except Exception:
+            # 챌린지 문서는 모두 CAPTCHA_TTL로 생성되므로 남은 TTL을 조회(TTL 왕복)하지 않고
+            # 카운터가 문서보다 먼저 만료되지 않도록 CAPTCHA_TTL을 그대로 사용
+            ttl = CAPTCHA_TTL
+        # HINCRBY로 서버에서 원자적으로 증가 (GET/수정/SETEX 경쟁 조건 제거)
+        pipe = r.pipeline(transaction=False)
+        pipe.hincrby(_counter_key(key), field, 1)
+        pipe.expire(_counter_key(key), ttl)
+        cur, _ = pipe.execute()
+        return int(cur)
+    except Exception as e:
+        _on_redis_error(r, e)
         return -1
 
+CHECKBOX_BLOCK_THRESHOLD = 3
+
+# KEYS[1]=세션 키, ARGV={now, is_low_score, ttl(0이면 생성 시 저장된 ttl), threshold}
+_CHECKBOX_INCR_LUA = """
+local k = KEYS[1]
+local attempts = redis.call('HINCRBY', k, 'attempts', 1)
+redis.call('HSET', k, 'last_attempt_at', ARGV[1])
+local low = redis.call('HINCRBY', k, 'low_score_attempts', tonumber(ARGV[2]))
+local blocked = tonumber(redis.call('HGET', k, 'is_blocked')) or 0
+if ARGV[2] == '1' and blocked ~= 1 and low >= tonumber(ARGV[4]) then
+    redis.call('HSET', k, 'is_blocked', 1)
+    blocked = 1
+end
+local ttl = tonumber(ARGV[3])
+if not ttl or ttl <= 0 then
+    ttl = tonumber(redis.call('HGET', k, 'ttl')) or 300
+end
+redis.call('EXPIRE', k, ttl)
+return {attempts, low, blocked}
+"""
+
+_checkbox_incr_script = None
+_checkbox_incr_script_owner = None
+
+# 차단된 세션은 TTL 동안 계속 차단 상태이므로, 반복 요청은 짧게 로컬에서 응답 (session_id -> 만료 시각)
+_BLOCKED_CACHE_TTL = 1.0
+_BLOCKED_CACHE_MAX = 10000
+_blocked_cache = {}
+_blocked_cache_lock = threading.Lock()
+
+
+def _remember_blocked(session_id: str) -> None:
+    now = time.monotonic()
+    with _blocked_cache_lock:
+        if len(_blocked_cache) >= _BLOCKED_CACHE_MAX:
+            for sid in [sid for sid, exp in _blocked_cache.items() if exp <= now]:
+                del _blocked_cache[sid]
+            if len(_blocked_cache) >= _BLOCKED_CACHE_MAX:
+                # 삽입 순서상 가장 오래된 항목 제거
+                del _blocked_cache[next(iter(_blocked_cache))]
+        _blocked_cache[session_id] = now + _BLOCKED_CACHE_TTL
+
+
+def _get_checkbox_incr_script(r):
+    # register_script는 EVALSHA를 사용하고 NOSCRIPT 시 자동으로 SCRIPT LOAD 후 재시도
+    global _checkbox_incr_script, _checkbox_incr_script_owner
+    if _checkbox_incr_script is None or _checkbox_incr_script_owner is not r:
+        _checkbox_incr_script = r.register_script(_CHECKBOX_INCR_LUA)
+        _checkbox_incr_script_owner = r
+    return _checkbox_incr_script
+
+
 def create_checkbox_session(session_id: str, ttl: int = 300) -> bool:
     """
     체크박스 세션을 생성합니다.
@@ -123,17 +339,16 @@ def create_checkbox_session(session_id: str, ttl: int = 300) -> bool:
         return False
     
     try:
-        session_data = {
-            "session_id": session_id,
-            "attempts": 0,
-            "low_score_attempts": 0,  # confidence_score 9 이하 시도 횟수
-            "is_blocked": False,
-            "created_at": time.time(),
-            "last_attempt_at": None
-        }
-        key = rkey("checkbox_session", session_id)
-        return redis_set_json(key, session_data, ttl)
-    except Exception:
+        session = CheckboxSession(session_id=session_id, created_at=_now_ms(), ttl=ttl)
+        key = _checkbox_key(session_id)
+        pipe = r.pipeline(transaction=False)
+        pipe.delete(key)  # 이전 JSON 형식 세션이 남아 있으면 제거
+        pipe.hset(key, mapping=session.to_mapping())
+        pipe.expire(key, ttl)
+        pipe.execute()
+        return True
+    except Exception as e:
+        _on_redis_error(r, e)
         return False
 
 
@@ -149,19 +364,28 @@ def get_checkbox_session(session_id: str) -> dict:
     """
     if not session_id:
         return None
-    
-    key = rkey("checkbox_session", session_id)
-    return redis_get_json(key)
+    r = get_redis()
+    if not r:
+        return None
+    try:
+        data = _read_primary(r, "HGETALL", _checkbox_key(session_id))
+    except Exception as e:
+        _on_redis_error(r, e)
+        return None
+    if not data:
+        return None
+    # 세션 ID는 조회 키로 이미 알고 있으므로 저장된 값을 다시 디코딩하지 않음
+    return asdict(CheckboxSession.from_hash(session_id, _decode_hash(data)))
 
 
-def increment_checkbox_attempts(session_id: str, is_bot_suspected: bool = False, ttl: int = 300) -> dict:
+def increment_checkbox_attempts(session_id: str, is_bot_suspected: bool = False, ttl: Optional[int] = None) -> dict:
     """
     체크박스 시도 횟수를 증가시킵니다.
     
     Args:
         session_id: 세션 ID
         is_bot_suspected: 봇으로 의심되는 시도 여부 (confidence_score >= 91)
-        ttl: 세션 만료 시간 (초)
+        ttl: 세션 만료 시간 (초, 생략 시 세션 생성 시 저장된 TTL 사용)
     
     Returns:
         dict: 업데이트된 세션 데이터 (status, is_disabled 포함)
@@ -171,37 +395,34 @@ def increment_checkbox_attempts(session_id: str, is_bot_suspected: bool = False,
         return {"status": "error", "is_disabled": False}
     
     try:
-        key = rkey("checkbox_session", session_id)
-        session_data = redis_get_json(key) or {}
+        key = _checkbox_key(session_id)
+        # 증가 + 차단 판정을 Lua 스크립트 한 번(EVALSHA)으로 원자적으로 처리
+        raw = _get_checkbox_incr_script(r)(
+            keys=[key],
+            args=[_now_ms(), 1 if is_bot_suspected else 0, ttl or 0, CHECKBOX_BLOCK_THRESHOLD],
+        )
+        # HGETALL 대신 증가 결과값만 반환받음: [attempts, low_score_attempts, is_blocked]
+        is_blocked = _to_int(raw[2]) == 1
         
-        # 전체 시도 횟수 증가
-        session_data["attempts"] = session_data.get("attempts", 0) + 1
-        session_data["last_attempt_at"] = time.time()
+        if is_blocked:
+            _remember_blocked(session_id)
         
         # 봇 의심 시도 처리
         if is_bot_suspected:
-            session_data["bot_attempts"] = session_data.get("bot_attempts", 0) + 1
-            
             # 3번 시도 후 완전 차단
-            if session_data["bot_attempts"] >= 3:
-                session_data["is_blocked"] = True
-                session_data["status"] = "blocked"
-            else:
-                session_data["status"] = "bot_suspected"
+            status = "blocked" if is_blocked else "bot_suspected"
         else:
             # 정상 시도
-            session_data["status"] = "success"
-        
-        # Redis에 저장
-        redis_set_json(key, session_data, ttl)
+            status = "success"
         
         # 응답 데이터 구성 (민감한 정보 제외)
         return {
-            "status": session_data.get("status", "success"),
-            "is_disabled": session_data.get("is_blocked", False),
-            "is_blocked": session_data.get("is_blocked", False)
+            "status": status,
+            "is_disabled": is_blocked,
+            "is_blocked": is_blocked
         }
-    except Exception:
+    except Exception as e:
+        _on_redis_error(r, e)
         return {"status": "error", "is_disabled": False}
 
 
@@ -215,10 +436,20 @@ def is_checkbox_session_blocked(session_id: str) -> bool:
     Returns:
         bool: 차단 여부
     """
-    session_data = get_checkbox_session(session_id)
-    if not session_data:
+    if not session_id:
         return False
-    
-    return session_data.get("is_blocked", False)
-
-
+    expires_at = _blocked_cache.get(session_id)
+    if expires_at is not None and expires_at > time.monotonic():
+        return True
+    r = get_redis()
+    if not r:
+        return False
+    try:
+        # 차단 여부 필드 하나만 조회 (HGETALL + 전체 필드 변환 생략)
+        blocked = _to_int(_read_primary(r, "HGET", _checkbox_key(session_id), "is_blocked")) == 1
+    except Exception as e:
+        _on_redis_error(r, e)
+        return False
+    if blocked:
+        _remember_blocked(session_id)
+    return blocked
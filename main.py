@@ -1,7 +1,8 @@
 from fastapi import FastAPI, Header
-from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
+from utils.cors import FastCORSMiddleware
 from fastapi import HTTPException
-from fastapi.responses import Response, RedirectResponse
+from fastapi.responses import Response, RedirectResponse, ORJSONResponse
 from pydantic import BaseModel
 from typing import Any, Dict, Optional, List, Tuple, Union
 from schemas.requests import (
@@ -12,6 +13,7 @@ from schemas.requests import (
 )
 from config.settings import (
     ENV,
+    LOG_LEVEL,
     CAPTCHA_TTL,
     USE_REDIS,
     REDIS_HOST,
@@ -21,6 +23,7 @@ from config.settings import (
     REDIS_SSL,
     REDIS_PREFIX,
     REDIS_TIMEOUT_MS,
+    CORS_ALLOW_ORIGINS,
 )
 from config.settings import (
     ML_PREDICT_BOT_URL,
@@ -62,7 +65,7 @@ from config.settings import (
 )
 from api.routers.next_captcha import router as next_captcha_router
 from api.routers.abstract import router as abstract_router
-from api.routers.handwriting import router as handwriting_router
+from api.routers.handwriting import router as handwriting_router, start_ocr_batcher, stop_ocr_batcher
 from api.routers.imagegrid import router as imagegrid_router
 from api.routers.secure_captcha import router as secure_captcha_router
 from api.routers.verify_captcha import router as verify_captcha_router
@@ -71,16 +74,29 @@ from api.routers.ip_management import router as ip_management_router
 from utils.text import normalize_text
 from infrastructure.redis_client import (
     get_redis,
+    reset_redis,
     rkey,
     redis_set_json,
     redis_get_json,
     redis_del,
     redis_incr_attempts,
 )
+from infrastructure.http_client import get_http_client, close_http_client
+from infrastructure.mongo_client import get_mongo_client, close_mongo_clients
+from infrastructure.mongo_writer import BEHAVIOR_WRITER
+from infrastructure.log_queue import start_log_listener, stop_log_listener
+from api.routers.routers_utils import (
+    start_prob_batcher,
+    stop_prob_batcher,
+    iter_random_images_excluding,
+    sample_images_from_dirs,
+    warm_image_index,
+    map_local_to_key,
+)
 from dotenv import load_dotenv
 import httpx
 import os
-import json
+import orjson
 import random
 import base64
 from io import BytesIO
@@ -91,16 +107,14 @@ from PIL import Image
 import time
 import hmac
 import hashlib
-import mimetypes
 import threading
  
 from dataclasses import dataclass
 from domain.models import AbstractCaptchaSession, ImageGridCaptchaSession
 from state.sessions import (
     ABSTRACT_SESSIONS,
-    ABSTRACT_SESSIONS_LOCK,
+    start_session_sweeper,
     IMAGE_GRID_SESSIONS,
-    IMAGE_GRID_LOCK,
 )
 from database import log_request, test_connection, update_daily_api_stats, get_db_cursor
 
@@ -118,22 +132,59 @@ load_dotenv()
 
 # 설정 값은 config.settings에서 import하여 사용합니다.
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
+
+# 고정 응답 본문은 import 시 한 번만 직렬화
+_ROOT_BODY = orjson.dumps({"Hello": "World"})
+_STATUS_OK_BODY = orjson.dumps({"status": "ok"})
 
 # 앱 시작 시 데이터베이스 초기화
 @app.on_event("startup")
 async def startup_event():
+    # 로그 출력은 큐 리스너 스레드에서 수행 (요청 처리 스레드가 stderr 쓰기를 기다리지 않음)
+    start_log_listener(LOG_LEVEL)
     from database import initialize_captcha_type_columns, initialize_logging_and_stats_tables
     initialize_captcha_type_columns()
     initialize_logging_and_stats_tables()
+    # Redis 상태 확인은 요청 경로가 아닌 워커 시작 시 1회만 수행
+    r = get_redis()
+    if r:
+        try:
+            r.ping()
+            print("✅ Redis 연결 확인 완료")
+        except Exception as e:
+            print(f"⚠️ Redis ping 실패: {e}")
+            reset_redis(r)
+    # ML 서비스 호출용 공유 HTTP 클라이언트는 워커 이벤트 루프에서 생성
+    app.state.ml_client = get_http_client()
+    # abstract 확률 예측 동시 요청 배처
+    start_prob_batcher()
+    # OCR 동시 요청 배처 (OCR_BATCH_API_URL 설정 시에만 기동)
+    start_ocr_batcher()
+    # 메모리 세션 저장소의 만료 항목 주기 청소
+    start_session_sweeper()
+    # 데이터셋 이미지 인덱스는 요청 경로가 아닌 시작 시 미리 구축 (local 모드만)
+    if ABSTRACT_CLASS_SOURCE != "remote":
+        await run_in_threadpool(warm_image_index)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await stop_prob_batcher()
+    await stop_ocr_batcher()
+    await close_http_client()
+    # 큐에 남은 행동 데이터를 저장한 뒤 Mongo 클라이언트 종료
+    await run_in_threadpool(BEHAVIOR_WRITER.close)
+    close_mongo_clients()
+    stop_log_listener()
 
 @app.get("/live")
 async def live():
-    return {"status": "ok"}
+    return Response(content=_STATUS_OK_BODY, media_type="application/json")
 
 @app.get("/ready")
 async def ready():
-    return {"status": "ok"}
+    return Response(content=_STATUS_OK_BODY, media_type="application/json")
 
 app.include_router(next_captcha_router)
 app.include_router(handwriting_router)
@@ -186,6 +237,7 @@ async def track_api_usage(api_key: str, endpoint: str, status_code: int, respons
             pass
 
 HANDWRITING_MANIFEST: Dict[str, Any] = {}
+HANDWRITING_MANIFEST_KEYS: Tuple[str, ...] = ()
 HANDWRITING_CURRENT_CLASS: Optional[str] = None
 HANDWRITING_CURRENT_IMAGES: list[str] = []
 
@@ -194,50 +246,24 @@ HANDWRITING_CURRENT_IMAGES: list[str] = []
 
 
 def _map_local_to_key(local_path: str) -> Optional[str]:
-    try:
-        root = Path(ABSTRACT_IMAGE_ROOT).resolve()
-        p = Path(local_path).resolve()
-        rel = p.relative_to(root)
-    except Exception:
-        return None
-    return str(rel).replace(os.sep, "/").lstrip("/")
+    # routers_utils의 캐시된 구현을 공유
+    return map_local_to_key(local_path)
 
 
 ## build_cdn_url, presign_url_for_key는 utils.cdn 모듈로 이동했습니다.
+from utils.cdn import presign_url_for_key
 
 
 def _presign_url_for_key(key: str) -> Optional[str]:
-    if ENV != "production":
-        return None
-    if not (OBJECT_STORAGE_BUCKET and OBJECT_STORAGE_ENDPOINT and OBJECT_STORAGE_ACCESS_KEY and OBJECT_STORAGE_SECRET_KEY):
-        return None
-    try:
-        import boto3  # lazy import
-        s3 = boto3.client(
-            "s3",
-            endpoint_url=OBJECT_STORAGE_ENDPOINT,
-            region_name=OBJECT_STORAGE_REGION,
-            aws_access_key_id=OBJECT_STORAGE_ACCESS_KEY,
-            aws_secret_access_key=OBJECT_STORAGE_SECRET_KEY,
-        )
-        return s3.generate_presigned_url(
-            "get_object",
-            Params={"Bucket": OBJECT_STORAGE_BUCKET, "Key": key},
-            ExpiresIn=PRESIGN_TTL_SECONDS,
-            HttpMethod="GET",
-        )
-    except Exception as e:
-        try:
-            print(f"⚠️ presign failed: {e}")
-        except Exception:
-            pass
-        return None
+    # utils.cdn의 캐시된 S3 클라이언트를 공유
+    return presign_url_for_key(key)
 
 
 def _load_handwriting_manifest(path: str) -> Dict[str, list[str]]:
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        # 바이너리로 읽어 orjson이 UTF-8을 직접 파싱 (텍스트 디코드 단계 생략)
+        with open(path, "rb") as f:
+            data = orjson.loads(f.read())
     except FileNotFoundError:
         print(f"⚠️ handwriting manifest not found at: {path}")
         return {}
@@ -271,64 +297,35 @@ def _select_handwriting_challenge() -> None:
         HANDWRITING_CURRENT_CLASS = None
         HANDWRITING_CURRENT_IMAGES = []
         return
-    cls = random.choice(list(HANDWRITING_MANIFEST.keys()))
-    images = HANDWRITING_MANIFEST.get(cls, [])
-    random.shuffle(images)
+    cls = random.choice(HANDWRITING_MANIFEST_KEYS)
+    images = HANDWRITING_MANIFEST.get(cls) or []
     HANDWRITING_CURRENT_CLASS = cls
-    HANDWRITING_CURRENT_IMAGES = images[:5] if len(images) >= 5 else images
+    # manifest 리스트를 섞지(변경하지) 않고 k개만 뽑음: O(n) 셔플 대신 O(k)
+    HANDWRITING_CURRENT_IMAGES = random.sample(images, min(5, len(images)))
 
 
-def _load_word_list(path: str) -> List[str]:
+def _load_word_list(path: str) -> Tuple[str, ...]:
     try:
-        lines = []
+        # 로드 시 1회 정리(공백 제거·중복 제거)하여 불변 튜플로 보관 (random.choice용 시퀀스)
         with open(path, "r", encoding="utf-8") as f:
-            for line in f:
-                t = line.strip()
-                if not t:
-                    continue
-                lines.append(t)
-        return lines
+            return tuple(dict.fromkeys(t for t in (line.strip() for line in f) if t))
     except Exception as e:
         print(f"⚠️ failed to load word list: {e}")
-        return []
+        return ()
 
 
 def _iter_random_images(root_dir: str, sample_size: int = 60) -> List[str]:
-    # 대용량 디렉터리에서 무작위 경로 샘플링
-    root = Path(root_dir)
-    if not root.exists():
-        return []
-    # 무작위 디렉터리 몇 개를 먼저 샘플링하여 탐색량 축소
-    subdirs = [p for p in root.iterdir() if p.is_dir()]
-    random.shuffle(subdirs)
-    picked: List[str] = []
-    for d in subdirs:
-        # 각 디렉토리에서 일부만 샘플링
-        files = [p for p in d.iterdir() if p.is_file() and p.suffix.lower() in (".jpg", ".jpeg", ".png", ".gif")]
-        random.shuffle(files)
-        for f in files[: max(3, sample_size // 10)]:
-            picked.append(str(f.resolve()))
-            if len(picked) >= sample_size:
-                break
-        if len(picked) >= sample_size:
-            break
-    # 백업: 상위에서 직접 스캔
-    if len(picked) < sample_size:
-        for p in root.rglob("*"):
-            if p.is_file() and p.suffix.lower() in (".jpg", ".jpeg", ".png", ".gif"):
-                picked.append(str(p.resolve()))
-                if len(picked) >= sample_size:
-                    break
-    random.shuffle(picked)
-    return picked[:sample_size]
+    # 대용량 디렉터리에서 무작위 경로 샘플링: 라우터 유틸의 인덱스 기반 샘플러 사용 (파일별 resolve 없음)
+    return iter_random_images_excluding(root_dir, [], sample_size)
 
 
 def _load_class_dir_map(path: str) -> Dict[str, List[str]]:
     if not path:
         return {}
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        # 바이너리로 읽어 orjson이 UTF-8을 직접 파싱 (텍스트 디코드 단계 생략)
+        with open(path, "rb") as f:
+            data = orjson.loads(f.read())
         mapping: Dict[str, List[str]] = {}
         if isinstance(data, dict):
             for k, v in data.items():
@@ -341,69 +338,27 @@ def _load_class_dir_map(path: str) -> Dict[str, List[str]]:
         print(f"⚠️ failed to load ABSTRACT_CLASS_DIR_MAP: {e}")
         return {}
 
-def _sample_images_from_dirs(dirs: List[str], desired_count: int) -> List[str]:
-    paths: List[str] = []
-    for d in dirs:
-        p = Path(d)
-        if not p.exists() or not p.is_dir():
-            continue
-        files = [fp for fp in p.iterdir() if fp.is_file() and fp.suffix.lower() in (".jpg", ".jpeg", ".png", ".gif")]
-        random.shuffle(files)
-        for f in files:
-            paths.append(str(f.resolve()))
-            if len(paths) >= desired_count:
-                break
-        if len(paths) >= desired_count:
-            break
-    random.shuffle(paths)
-    return paths[:desired_count]
-
-
-def _iter_random_images_excluding(root_dir: str, exclude_dirs: List[str], sample_size: int) -> List[str]:
-    root = Path(root_dir).resolve()
-    exclude_roots = [Path(d).resolve() for d in exclude_dirs if d]
-
-    def _is_under_excluded(p: Path) -> bool:
-        try:
-            pr = p.resolve()
-        except Exception:
-            pr = p
-        pr_str = str(pr)
-        for ex in exclude_roots:
-            ex_str = str(ex)
-            # 간단한 경로 포함 체크 (Windows 호환)
-            if pr_str.startswith(ex_str + os.sep) or pr_str == ex_str:
-                return True
-        return False
-
-    # 루트 전체를 순회하며 랜덤 샘플링 (제외 디렉터리 하위는 건너뜀)
-    all_files: List[Path] = []
-    try:
-        for p in root.rglob('*'):
-            if not p.is_file():
-                continue
-            if p.suffix.lower() not in ('.jpg', '.jpeg', '.png', '.gif'):
-                continue
-            if _is_under_excluded(p):
-                continue
-            all_files.append(p)
-    except Exception:
-        pass
-    random.shuffle(all_files)
-    return [str(p.resolve()) for p in all_files[:sample_size]]
+# os.scandir 기반(파일별 resolve 없음) 구현을 라우터 유틸과 공유
+_sample_images_from_dirs = sample_images_from_dirs
+
+
+# 스트리밍 reservoir 샘플러를 라우터 유틸과 공유
+_iter_random_images_excluding = iter_random_images_excluding
 
 
-def _load_keyword_map(path: str) -> Dict[str, List[str]]:
+def _load_keyword_map(path: str) -> Dict[str, Tuple[str, ...]]:
     if not path:
         return {}
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        mapping: Dict[str, List[str]] = {}
+        # 바이너리로 읽어 orjson이 UTF-8을 직접 파싱 (텍스트 디코드 단계 생략)
+        with open(path, "rb") as f:
+            data = orjson.loads(f.read())
+        mapping: Dict[str, Tuple[str, ...]] = {}
         if isinstance(data, dict):
             for k, v in data.items():
                 if isinstance(v, list):
-                    cleaned = [str(x).strip() for x in v if str(x).strip()]
+                    # 요청마다 중복 제거하지 않도록 로드 시 1회 정리하여 불변 튜플로 보관
+                    cleaned = tuple(dict.fromkeys(str(x).strip() for x in v if str(x).strip()))
                     if cleaned:
                         mapping[str(k)] = cleaned
         return mapping
@@ -435,8 +390,10 @@ def _get_behavior_mongo_client():
     if not (SAVE_BEHAVIOR_TO_MONGO and BEHAVIOR_MONGO_URI):
         return None
     try:
-        from pymongo import MongoClient  # type: ignore
-        _mongo_client_for_behavior = MongoClient(BEHAVIOR_MONGO_URI, serverSelectionTimeoutMS=3000)
+        # 매니페스트 로더와 같은 URI면 같은 풀을 공유
+        _mongo_client_for_behavior = get_mongo_client(BEHAVIOR_MONGO_URI)
+        if _mongo_client_for_behavior is None:
+            return None
         # 연결 확인 (예외 발생 시 캐시하지 않음)
         _ = _mongo_client_for_behavior.server_info()
         return _mongo_client_for_behavior
@@ -455,63 +412,43 @@ def _save_behavior_to_mongo(doc: Dict[str, Any]) -> None:
     client = _get_behavior_mongo_client()
     if not client or not BEHAVIOR_MONGO_DB or not BEHAVIOR_MONGO_COLLECTION:
         return
-    def _worker(payload: Dict[str, Any]):
-        try:
-            client[BEHAVIOR_MONGO_DB][BEHAVIOR_MONGO_COLLECTION].insert_one(payload)
-        except Exception as e:
-            try:
-                print(f"⚠️ insert behavior_data failed: {e}")
-            except Exception:
-                pass
+    # 요청마다 스레드를 만들지 않고 배치 writer 큐에 위임 (워커가 모아서 insert_many)
     try:
-        threading.Thread(target=_worker, args=(doc,), daemon=True).start()
+        BEHAVIOR_WRITER.enqueue(client, BEHAVIOR_MONGO_DB, BEHAVIOR_MONGO_COLLECTION, doc)
     except Exception:
-        # 최후 폴백: 동기 시도 (에러 무시)
-        try:
-            client[BEHAVIOR_MONGO_DB][BEHAVIOR_MONGO_COLLECTION].insert_one(doc)
-        except Exception:
-            pass
+        pass
 
 def _load_class_dir_map_from_mongo(uri: str, db: str, col: str, doc_id: str) -> Dict[str, List[str]]:
     try:
         if not (uri and db and col and doc_id):
             return {}
-        try:
-            from pymongo import MongoClient  # type: ignore
-        except Exception as e:
-            print(f"⚠️ pymongo not available: {e}")
+        client = get_mongo_client(uri)
+        if client is None:
             return {}
-        client = MongoClient(uri, serverSelectionTimeoutMS=3000)
-        try:
-            collection = client[db][col]
-            mapping: Dict[str, List[str]] = {}
-            # 1) doc_id가 지정되어 있으면 그 도큐먼트 우선 시도
-            if doc_id:
-                doc = collection.find_one({"_id": doc_id})
-                if doc:
-                    data = doc.get("json_data") or doc.get("data") or {k: v for k, v in doc.items() if k not in ("_id",)}
-                    if isinstance(data, dict):
-                        for k, v in data.items():
-                            if isinstance(v, list):
-                                mapping[str(k)] = [str(x) for x in v]
-                            else:
-                                mapping[str(k)] = [str(v)]
-                        return mapping
-            # 2) 컬렉션의 모든 도큐먼트를 스캔하여 name/cdn_prefix로 구성
-            #    { name: [cdn_prefix], ... } 형태로 매핑 생성
-            cursor = collection.find({}, {"name": 1, "cdn_prefix": 1})
-            for d in cursor:
-                cls = str(d.get("name") or "").strip()
-                prefix = str(d.get("cdn_prefix") or "").strip()
-                if not cls or not prefix:
-                    continue
-                mapping.setdefault(cls, []).append(prefix)
-            return mapping
-        finally:
-            try:
-                client.close()
-            except Exception:
-                pass
+        collection = client[db][col]
+        mapping: Dict[str, List[str]] = {}
+        # 1) doc_id가 지정되어 있으면 그 도큐먼트 우선 시도
+        if doc_id:
+            doc = collection.find_one({"_id": doc_id})
+            if doc:
+                data = doc.get("json_data") or doc.get("data") or {k: v for k, v in doc.items() if k not in ("_id",)}
+                if isinstance(data, dict):
+                    for k, v in data.items():
+                        if isinstance(v, list):
+                            mapping[str(k)] = [str(x) for x in v]
+                        else:
+                            mapping[str(k)] = [str(v)]
+                    return mapping
+        # 2) 컬렉션의 모든 도큐먼트를 스캔하여 name/cdn_prefix로 구성
+        #    { name: [cdn_prefix], ... } 형태로 매핑 생성
+        cursor = collection.find({}, {"name": 1, "cdn_prefix": 1})
+        for d in cursor:
+            cls = str(d.get("name") or "").strip()
+            prefix = str(d.get("cdn_prefix") or "").strip()
+            if not cls or not prefix:
+                continue
+            mapping.setdefault(cls, []).append(prefix)
+        return mapping
     except Exception as e:
         print(f"⚠️ failed to load class_dir_map from Mongo: {e}")
         return {}
@@ -521,51 +458,48 @@ def _load_handwriting_manifest_from_mongo(uri: str, db: str, col: str) -> Dict[s
     try:
         if not (uri and db and col):
             return {}
-        try:
-            from pymongo import MongoClient  # type: ignore
-        except Exception as e:
-            print(f"⚠️ pymongo not available for handwriting manifest: {e}")
+        client = get_mongo_client(uri)
+        if client is None:
             return {}
-        client = MongoClient(uri, serverSelectionTimeoutMS=3000)
+        c = client[db][col]
+        mapping: Dict[str, List[str]] = {}
+        # per-class documents
         try:
-            c = client[db][col]
-            mapping: Dict[str, List[str]] = {}
-            # per-class documents
-            try:
-                cur = c.find({"_id": {"$regex": "^manifest:"}}, {"class": 1, "keys": 1})
-                any_docs = False
-                for d in cur:
-                    any_docs = True
-                    cls = str(d.get("class") or "").strip()
-                    keys = [str(x) for x in (d.get("keys") or []) if isinstance(x, (str,))]
-                    if cls and keys:
-                        mapping[cls] = keys
-                if mapping:
-                    return mapping
-                if not any_docs:
-                    pass
-            except Exception:
-                pass
-            # single-document fallback
-            try:
-                doc = c.find_one({"_id": MONGO_DOC_ID})
-                if doc:
-                    data = doc.get("json_data") or doc.get("data")
-                    if isinstance(data, dict):
-                        for k, v in data.items():
-                            if isinstance(v, list):
-                                mapping[str(k)] = [str(x) for x in v]
-                            else:
-                                mapping[str(k)] = [str(v)]
-                        return mapping
-            except Exception:
-                pass
-            return {}
-        finally:
-            try:
-                client.close()
-            except Exception:
+            # 앵커(^)가 있는 접두 정규식이라 _id 인덱스 범위 스캔. 큰 배치로 왕복 횟수를 줄이고 comment로 식별
+            cur = c.find(
+                {"_id": {"$regex": "^manifest:"}},
+                {"class": 1, "keys": 1},
+                batch_size=500,
+                comment="manifest_load",
+            )
+            any_docs = False
+            for d in cur:
+                any_docs = True
+                cls = str(d.get("class") or "").strip()
+                keys = [x for x in (d.get("keys") or ()) if isinstance(x, str)]
+                if cls and keys:
+                    mapping[cls] = keys
+            if mapping:
+                return mapping
+            if not any_docs:
                 pass
+        except Exception:
+            pass
+        # single-document fallback
+        try:
+            doc = c.find_one({"_id": MONGO_DOC_ID})
+            if doc:
+                data = doc.get("json_data") or doc.get("data")
+                if isinstance(data, dict):
+                    for k, v in data.items():
+                        if isinstance(v, list):
+                            mapping[str(k)] = [str(x) for x in v]
+                        else:
+                            mapping[str(k)] = [str(v)]
+                    return mapping
+        except Exception:
+            pass
+        return {}
     except Exception as e:
         print(f"⚠️ failed to load handwriting manifest from Mongo: {e}")
         return {}
@@ -576,51 +510,48 @@ def _load_file_keys_manifest_from_mongo(uri: str, db: str, col: str) -> Dict[str
     try:
         if not (uri and db and col):
             return {}
-        try:
-            from pymongo import MongoClient  # type: ignore
-        except Exception as e:
-            print(f"⚠️ pymongo not available for abstract manifest: {e}")
+        client = get_mongo_client(uri)
+        if client is None:
             return {}
-        client = MongoClient(uri, serverSelectionTimeoutMS=3000)
+        c = client[db][col]
+        mapping: Dict[str, List[str]] = {}
+        # per-class documents
         try:
-            c = client[db][col]
-            mapping: Dict[str, List[str]] = {}
-            # per-class documents
-            try:
-                cur = c.find({"_id": {"$regex": "^manifest:"}}, {"class": 1, "keys": 1})
-                any_docs = False
-                for d in cur:
-                    any_docs = True
-                    cls = str(d.get("class") or "").strip()
-                    keys = [str(x) for x in (d.get("keys") or []) if isinstance(x, (str,))]
-                    if cls and keys:
-                        mapping[cls] = keys
-                if mapping:
-                    return mapping
-                if not any_docs:
-                    pass
-            except Exception:
-                pass
-            # single-document fallback
-            try:
-                doc = c.find_one({"_id": MONGO_DOC_ID})
-                if doc:
-                    data = doc.get("json_data") or doc.get("data")
-                    if isinstance(data, dict):
-                        for k, v in data.items():
-                            if isinstance(v, list):
-                                mapping[str(k)] = [str(x) for x in v]
-                            else:
-                                mapping[str(k)] = [str(v)]
-                        return mapping
-            except Exception:
-                pass
-            return {}
-        finally:
-            try:
-                client.close()
-            except Exception:
+            # 앵커(^)가 있는 접두 정규식이라 _id 인덱스 범위 스캔. 큰 배치로 왕복 횟수를 줄이고 comment로 식별
+            cur = c.find(
+                {"_id": {"$regex": "^manifest:"}},
+                {"class": 1, "keys": 1},
+                batch_size=500,
+                comment="manifest_load",
+            )
+            any_docs = False
+            for d in cur:
+                any_docs = True
+                cls = str(d.get("class") or "").strip()
+                keys = [x for x in (d.get("keys") or ()) if isinstance(x, str)]
+                if cls and keys:
+                    mapping[cls] = keys
+            if mapping:
+                return mapping
+            if not any_docs:
                 pass
+        except Exception:
+            pass
+        # single-document fallback
+        try:
+            doc = c.find_one({"_id": MONGO_DOC_ID})
+            if doc:
+                data = doc.get("json_data") or doc.get("data")
+                if isinstance(data, dict):
+                    for k, v in data.items():
+                        if isinstance(v, list):
+                            mapping[str(k)] = [str(x) for x in v]
+                        else:
+                            mapping[str(k)] = [str(v)]
+                    return mapping
+        except Exception:
+            pass
+        return {}
     except Exception as e:
         print(f"⚠️ failed to load abstract manifest from Mongo: {e}")
         return {}
@@ -631,39 +562,30 @@ def _load_basic_manifest_from_mongo(uri: str, db: str, col: str) -> List[str]:
     try:
         if not (uri and db and col):
             return []
-        try:
-            from pymongo import MongoClient  # type: ignore
-        except Exception as e:
-            print(f"⚠️ pymongo not available for basic manifest: {e}")
+        client = get_mongo_client(uri)
+        if client is None:
             return []
-        client = MongoClient(uri, serverSelectionTimeoutMS=3000)
+        c = client[db][col]
+        keys: List[str] = []
         try:
-            c = client[db][col]
-            keys: List[str] = []
-            try:
-                for d in c.find({}, {"keys": 1, "key": 1}):
-                    if isinstance(d.get("keys"), list):
-                        for k in d.get("keys"):
-                            if isinstance(k, str) and k.strip():
-                                keys.append(k.strip())
-                    else:
-                        k = d.get("key")
+            for d in c.find({}, {"keys": 1, "key": 1}, batch_size=500, comment="basic_manifest_load"):
+                if isinstance(d.get("keys"), list):
+                    for k in d.get("keys"):
                         if isinstance(k, str) and k.strip():
                             keys.append(k.strip())
-            except Exception:
-                pass
-            if keys:
-                return list(dict.fromkeys(keys))
-            doc = c.find_one({}, {"keys": 1})
-            if doc and isinstance(doc.get("keys"), list):
-                cleaned = [str(x).strip() for x in doc.get("keys") if isinstance(x, str) and str(x).strip()]
-                return list(dict.fromkeys(cleaned))
-            return []
-        finally:
-            try:
-                client.close()
-            except Exception:
-                pass
+                else:
+                    k = d.get("key")
+                    if isinstance(k, str) and k.strip():
+                        keys.append(k.strip())
+        except Exception:
+            pass
+        if keys:
+            return list(dict.fromkeys(keys))
+        doc = c.find_one({}, {"keys": 1})
+        if doc and isinstance(doc.get("keys"), list):
+            cleaned = [str(x).strip() for x in doc.get("keys") if isinstance(x, str) and str(x).strip()]
+            return list(dict.fromkeys(cleaned))
+        return []
     except Exception as e:
         print(f"⚠️ failed to load basic manifest from Mongo: {e}")
         return []
@@ -681,6 +603,7 @@ except Exception:
 
 # 서버 시작 시 handwriting 매니페스트 로드 (Mongo 전용) 및 샘플 선택
 HANDWRITING_MANIFEST = _load_handwriting_manifest_from_mongo(MONGO_URI, MONGO_DB, MONGO_MANIFEST_COLLECTION)
+HANDWRITING_MANIFEST_KEYS = tuple(HANDWRITING_MANIFEST)
 _select_handwriting_challenge()
 try:
     print(
@@ -706,13 +629,13 @@ except Exception:
 
 # CORS 설정
 app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
+    FastCORSMiddleware,
+    allow_origins=CORS_ALLOW_ORIGINS,
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     allow_headers=["*"],
 )
 
 @app.get("/")
-def read_root():
-    return {"Hello": "World"}
+async def read_root():
+    return Response(content=_ROOT_BODY, media_type="application/json")
@@ -1,4 +1,4 @@
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set
 from pydantic import BaseModel
 
 
@@ -18,7 +18,7 @@ class HandwritingVerifyRequest(BaseModel):
 class AbstractVerifyRequest(BaseModel):
     captcha_token: str  # 캡차 토큰 필수
     challenge_id: str
-    selections: List[int]
+    selections: Set[int]  # 파싱 단계에서 중복 제거 (검증 시 별도 set() 변환 불필요)
     user_id: Optional[int] = None
     api_key: Optional[str] = None
     signatures: Optional[List[str]] = None
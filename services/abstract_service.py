@@ -1,10 +1,25 @@
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional
 import time
 
-from infrastructure.redis_client import rkey, get_redis, redis_set_json, redis_get_json, redis_del, redis_incr_attempts
+from infrastructure.redis_client import rkey, get_redis, redis_set_json, redis_get_json, redis_del_challenge, redis_incr_attempts
 from config.settings import CAPTCHA_TTL
 import uuid, time
-from state.sessions import ABSTRACT_SESSIONS, ABSTRACT_SESSIONS_LOCK
+from domain.models import AbstractCaptchaSession
+from state.sessions import ABSTRACT_SESSIONS
+
+
+def _positive_mask(is_positive: List[bool]) -> int:
+    return sum(1 << i for i, flag in enumerate(is_positive) if flag)
+
+
+def _selection_mask(selections: Optional[Iterable[int]], image_count: int) -> Optional[int]:
+    """선택 인덱스를 비트마스크로 변환. 범위를 벗어난 인덱스가 있으면 None (= 오답)."""
+    mask = 0
+    for i in selections or ():
+        if not (0 <= i < image_count):
+            return None
+        mask |= 1 << i
+    return mask
 
 
 def create_abstract_captcha(image_urls: list[str], target_class: str, is_positive: list[bool], keywords: list[str]) -> Dict[str, Any]:
@@ -18,10 +33,20 @@ def create_abstract_captcha(image_urls: list[str], target_class: str, is_positiv
             "keywords": keywords,
             "image_urls": list(image_urls),
             "is_positive": list(is_positive),
-            "attempts": 0,
+            "positive_mask": _positive_mask(is_positive),
             "created_at": time.time(),
         }
         redis_set_json(rkey("abstract", challenge_id), doc, ttl_seconds)
+    else:
+        ABSTRACT_SESSIONS.set(challenge_id, AbstractCaptchaSession(
+            challenge_id=challenge_id,
+            target_class=target_class,
+            image_paths=list(image_urls),
+            is_positive=list(is_positive),
+            ttl_seconds=ttl_seconds,
+            keywords=list(keywords),
+            created_at=time.time(),
+        ), ttl_seconds)
     return {
         "challenge_id": challenge_id,
         "question": f"{keywords[0]} 이미지를 골라주세요" if keywords else "Select",
@@ -32,19 +57,21 @@ def create_abstract_captcha(image_urls: list[str], target_class: str, is_positiv
     }
 
 
-def verify_abstract(challenge_id: str, selections: List[int], *, user_id: Optional[int] = None, api_key: Optional[str] = None) -> Dict[str, Any]:
+def verify_abstract(challenge_id: str, selections: Iterable[int], *, user_id: Optional[int] = None, api_key: Optional[str] = None) -> Dict[str, Any]:
     if get_redis():
         key = rkey("abstract", challenge_id)
         doc = redis_get_json(key)
         if not doc:
             return {"success": False, "message": "Challenge not found"}
-        selections_set = set(selections or [])
-        is_positive = list(doc.get("is_positive", []) or [])
-        positives_set = {i for i, flag in enumerate(is_positive) if flag}
-        is_pass = positives_set == selections_set
+        is_positive = doc.get("is_positive", []) or []
+        positive_mask = doc.get("positive_mask")
+        if positive_mask is None:
+            # 이전 형식 문서 호환: is_positive 플래그에서 계산
+            positive_mask = _positive_mask(is_positive)
+        is_pass = _selection_mask(selections, len(is_positive)) == positive_mask
         attempts = redis_incr_attempts(key)
         if is_pass or (isinstance(attempts, int) and attempts >= 1):
-            redis_del(key)
+            redis_del_challenge(key)
         return {
             "success": is_pass,
             "attempts": attempts if isinstance(attempts, int) and attempts >= 0 else None,
@@ -53,22 +80,12 @@ def verify_abstract(challenge_id: str, selections: List[int], *, user_id: Option
             "expired": False,
         }
 
-    # 메모리 폴백 (요약 버전)
-    with ABSTRACT_SESSIONS_LOCK:
-        session = ABSTRACT_SESSIONS.get(challenge_id)
+    # 메모리 폴백 (요약 버전): 1회 시도 후 폐기 정책이므로 pop으로 원자적으로 소비
+    session = ABSTRACT_SESSIONS.pop(challenge_id)
     if not session:
         return {"success": False, "message": "Challenge not found"}
-    if session.is_expired():
-        with ABSTRACT_SESSIONS_LOCK:
-            ABSTRACT_SESSIONS.pop(challenge_id, None)
-        return {"success": False, "message": "Challenge expired"}
-    selections_set = set(selections or [])
-    positives_set = {i for i, flag in enumerate(session.is_positive) if flag}
-    is_pass = positives_set == selections_set
-    with ABSTRACT_SESSIONS_LOCK:
-        session.attempts += 1
-        if is_pass or session.attempts >= 1:
-            ABSTRACT_SESSIONS.pop(challenge_id, None)
+    is_pass = _selection_mask(selections, len(session.is_positive)) == session.positive_mask
+    session.attempts += 1
     return {
         "success": is_pass,
         "attempts": session.attempts,
@@ -76,5 +93,3 @@ def verify_abstract(challenge_id: str, selections: List[int], *, user_id: Option
         "keywords": session.keywords,
         "expired": False,
     }
-
-
@@ -1,6 +1,6 @@
 from typing import Any, Dict, Optional
 
-from infrastructure.redis_client import rkey, get_redis, redis_get_json, redis_del, redis_incr_attempts, redis_set_json
+from infrastructure.redis_client import rkey, get_redis, redis_get_json, redis_del_challenge, redis_incr_attempts, redis_set_json
 from utils.handwriting_mapping import get_answer_classes
 from config.settings import CAPTCHA_TTL
 import uuid, time
@@ -20,7 +20,6 @@ def create_handwriting_challenge(samples: list[str], target_class: str) -> dict:
             "samples": samples,
             "target_class": target_class,
             "answer_classes": answer_classes,
-            "attempts": 0,
             "created_at": time.time(),
         }
         print(f"🔧 [handwriting_service] Redis 저장: {doc}")
@@ -49,11 +48,11 @@ def verify_handwriting(challenge_id: str, text_norm: str, *, user_id: Optional[i
     target_class = str((redis_doc or {}).get("target_class") or "")
     allowed_answers = (redis_doc or {}).get("answer_classes") or get_answer_classes(target_class)
     # 정답은 answer_classes 목록에 포함되면 성공
-    is_match = text_norm in set([str(x) for x in allowed_answers])
+    is_match = text_norm in {str(x) for x in allowed_answers}
     if redis_doc and redis_key:
         attempts = redis_incr_attempts(redis_key)
         if is_match or (isinstance(attempts, int) and attempts >= 1):
-            redis_del(redis_key)
+            redis_del_challenge(redis_key)
     return {"success": is_match}
 
 
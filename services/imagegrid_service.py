@@ -1,8 +1,9 @@
 from typing import Any, Dict, List, Optional
 import os, time, uuid
 from domain.models import ImageGridCaptchaSession
-from infrastructure.redis_client import get_redis, rkey, redis_set_json, redis_get_json, redis_del, redis_incr_attempts
-from state.sessions import IMAGE_GRID_SESSIONS, IMAGE_GRID_LOCK
+from infrastructure.redis_client import get_redis, rkey, redis_set_json, redis_get_json, redis_del_challenge, redis_incr_attempts
+from infrastructure.mongo_client import get_mongo_client
+from state.sessions import IMAGE_GRID_SESSIONS
 from config.settings import CAPTCHA_TTL
 
 
@@ -12,12 +13,14 @@ def create_imagegrid_challenge() -> Dict[str, Any]:
     target_label: Optional[str] = None
     correct_cells: List[int] = []
     try:
-        from pymongo import MongoClient  # type: ignore
         uri = os.getenv("MONGO_URI", os.getenv("MONGO_URL", ""))
         dbn = os.getenv("MONGO_DB", "")
         # Image captcha 컬렉션은 환경변수 MONGO_BASIC_COLLECTION만 사용
         coln = os.getenv("MONGO_BASIC_COLLECTION")
-        client = MongoClient(uri, serverSelectionTimeoutMS=3000)
+        # 요청마다 새 MongoClient(및 커넥션 풀)를 만들지 않고 공유 클라이언트 사용
+        client = get_mongo_client(uri)
+        if client is None:
+            raise RuntimeError("MongoDB client unavailable")
         coll = client[dbn][coln]
         doc = coll.aggregate([{"$sample": {"size": 1}}]).next()
     except Exception:
@@ -44,21 +47,19 @@ def create_imagegrid_challenge() -> Dict[str, Any]:
                 "type": "imagegrid",
                 "cid": challenge_id,
                 "image_url": url,
-                "attempts": 0,
                 "created_at": session.created_at,
                 "target_label": session.target_label,
-                "correct_cells": list(session.correct_cells or []),
+                # 정렬·중복 제거된 목록으로 저장 (검증 응답에 그대로 사용)
+                "correct_cells": sorted(session.correct_set),
             }
             ok = redis_set_json(rkey("imagegrid", challenge_id), doc, session.ttl_seconds)
             print(f"🧰 [imagegrid] redis set {rkey('imagegrid', challenge_id)} ok={ok}")
             if not ok:
                 raise RuntimeError("redis setex failed")
         except Exception:
-            with IMAGE_GRID_LOCK:
-                IMAGE_GRID_SESSIONS[challenge_id] = session
+            IMAGE_GRID_SESSIONS.set(challenge_id, session, session.ttl_seconds)
     else:
-        with IMAGE_GRID_LOCK:
-            IMAGE_GRID_SESSIONS[challenge_id] = session
+        IMAGE_GRID_SESSIONS.set(challenge_id, session, session.ttl_seconds)
 
     # 질문 문구 매핑 적용
     label_message_map = {
@@ -87,13 +88,15 @@ def verify_imagegrid(challenge_id: str, selections: List[int]) -> Dict[str, Any]
         doc = redis_get_json(key)
         if not doc:
             return {"success": False, "message": "Challenge not found"}
-        sel = sorted(set(int(x) for x in (selections or [])))
+        sel_set = {int(x) for x in (selections or ())}
         target_label = str(doc.get("target_label", ""))
-        correct = sorted(set(int(x) for x in (doc.get("correct_cells", []) or [])))
-        ok = sel == correct
+        correct_set = {int(x) for x in (doc.get("correct_cells", []) or ())}
+        # 정답 판정은 집합 비교로, 정렬은 응답 페이로드용으로만 수행
+        ok = sel_set == correct_set
+        sel, correct = sorted(sel_set), sorted(correct_set)
         attempts = redis_incr_attempts(key)
         if ok or (isinstance(attempts, int) and attempts >= 1):
-            redis_del(key)
+            redis_del_challenge(key)
         payload = {
             "success": ok,
             "attempts": attempts if isinstance(attempts, int) and attempts >= 0 else None,
@@ -106,24 +109,18 @@ def verify_imagegrid(challenge_id: str, selections: List[int]) -> Dict[str, Any]
             payload["downshift"] = True
         return payload
 
-    with IMAGE_GRID_LOCK:
-        session = IMAGE_GRID_SESSIONS.get(challenge_id)
+    # 메모리 폴백: 1회 시도 후 폐기 정책이므로 pop으로 원자적으로 소비 (만료 항목은 저장소가 None으로 처리)
+    session = IMAGE_GRID_SESSIONS.pop(challenge_id)
     if not session:
         return {"success": False, "message": "Challenge not found"}
-    if (time.time() - session.created_at) > session.ttl_seconds:
-        with IMAGE_GRID_LOCK:
-            IMAGE_GRID_SESSIONS.pop(challenge_id, None)
-        return {"success": False, "message": "Challenge expired"}
 
-    sel = sorted(set(int(x) for x in (selections or [])))
+    sel_set = {int(x) for x in (selections or ())}
     target_label = session.target_label
-    correct = sorted(set(session.correct_cells or []))
-    ok = sel == correct
-    with IMAGE_GRID_LOCK:
-        session.attempts += 1
-        attempts = session.attempts
-        if ok or attempts >= 1:
-            IMAGE_GRID_SESSIONS.pop(challenge_id, None)
+    # 정답 집합은 세션 생성 시 계산된 frozenset 사용
+    ok = sel_set == session.correct_set
+    sel, correct = sorted(sel_set), sorted(session.correct_set)
+    session.attempts += 1
+    attempts = session.attempts
     payload = {
         "success": ok,
         "attempts": attempts,
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
 from typing import Any, Dict, List, Optional, Tuple
+import threading
+import time
 
+from infrastructure.mongo_client import get_mongo_client
 from config.settings import (
     MONGO_URI,
     MONGO_DB,
@@ -11,57 +14,60 @@ from config.settings import (
 
 
 HANDWRITING_MANIFEST: Dict[str, List[str]] = {}
+HANDWRITING_MANIFEST_KEYS: Tuple[str, ...] = ()  # random.choice용 클래스 목록 (로드 시 1회 생성)
 HANDWRITING_CURRENT_CLASS: Optional[str] = None
 HANDWRITING_CURRENT_IMAGES: List[str] = []
 
+# 시작 시 로드가 실패(빈 manifest)한 경우에만 요청 경로에서 재시도하되, 간격을 두어 Mongo를 두드리지 않음
+_MANIFEST_RETRY_INTERVAL_SECONDS = 30.0
+_MANIFEST_LAST_LOAD = 0.0
+_MANIFEST_LOCK = threading.Lock()
+
 
 def _load_handwriting_manifest_from_mongo(uri: str, db: str, col: str) -> Dict[str, List[str]]:
     try:
         if not (uri and db and col):
             return {}
-        try:
-            from pymongo import MongoClient  # type: ignore
-        except Exception as e:
-            print(f"⚠️ pymongo not available for handwriting manifest: {e}")
+        client = get_mongo_client(uri)
+        if client is None:
             return {}
-        client = MongoClient(uri, serverSelectionTimeoutMS=3000)
+        c = client[db][col]
+        mapping: Dict[str, List[str]] = {}
         try:
-            c = client[db][col]
-            mapping: Dict[str, List[str]] = {}
-            try:
-                cur = c.find({"_id": {"$regex": "^manifest:"}}, {"class": 1, "keys": 1})
-                any_docs = False
-                for d in cur:
-                    any_docs = True
-                    cls = str(d.get("class") or "").strip()
-                    keys = [str(x) for x in (d.get("keys") or []) if isinstance(x, (str,))]
-                    if cls and keys:
-                        mapping[cls] = keys
-                if mapping:
-                    return mapping
-                if not any_docs:
-                    pass
-            except Exception:
-                pass
-            try:
-                doc = c.find_one({"_id": MONGO_DOC_ID})
-                if doc:
-                    data = doc.get("json_data") or doc.get("data")
-                    if isinstance(data, dict):
-                        for k, v in data.items():
-                            if isinstance(v, list):
-                                mapping[str(k)] = [str(x) for x in v]
-                            else:
-                                mapping[str(k)] = [str(v)]
-                        return mapping
-            except Exception:
-                pass
-            return {}
-        finally:
-            try:
-                client.close()
-            except Exception:
+            # 앵커(^)가 있는 접두 정규식이라 _id 인덱스 범위 스캔. 큰 배치로 왕복 횟수를 줄이고 comment로 식별
+            cur = c.find(
+                {"_id": {"$regex": "^manifest:"}},
+                {"class": 1, "keys": 1},
+                batch_size=500,
+                comment="manifest_load",
+            )
+            any_docs = False
+            for d in cur:
+                any_docs = True
+                cls = str(d.get("class") or "").strip()
+                keys = [x for x in (d.get("keys") or ()) if isinstance(x, str)]
+                if cls and keys:
+                    mapping[cls] = keys
+            if mapping:
+                return mapping
+            if not any_docs:
                 pass
+        except Exception:
+            pass
+        try:
+            doc = c.find_one({"_id": MONGO_DOC_ID})
+            if doc:
+                data = doc.get("json_data") or doc.get("data")
+                if isinstance(data, dict):
+                    for k, v in data.items():
+                        if isinstance(v, list):
+                            mapping[str(k)] = [str(x) for x in v]
+                        else:
+                            mapping[str(k)] = [str(v)]
+                    return mapping
+        except Exception:
+            pass
+        return {}
     except Exception as e:
         print(f"⚠️ failed to load handwriting manifest from Mongo: {e}")
         return {}
@@ -74,16 +80,18 @@ def _select_handwriting_challenge() -> None:
         HANDWRITING_CURRENT_IMAGES = []
         return
     import random
-    cls = random.choice(list(HANDWRITING_MANIFEST.keys()))
-    images = HANDWRITING_MANIFEST.get(cls, [])
-    random.shuffle(images)
+    cls = random.choice(HANDWRITING_MANIFEST_KEYS)
+    images = HANDWRITING_MANIFEST.get(cls) or []
     HANDWRITING_CURRENT_CLASS = cls
-    HANDWRITING_CURRENT_IMAGES = images[:5] if len(images) >= 5 else images
+    # manifest 리스트를 섞지(변경하지) 않고 k개만 뽑음: O(n) 셔플 대신 O(k)
+    HANDWRITING_CURRENT_IMAGES = random.sample(images, min(5, len(images)))
 
 
 def initialize() -> None:
-    global HANDWRITING_MANIFEST
+    global HANDWRITING_MANIFEST, HANDWRITING_MANIFEST_KEYS, _MANIFEST_LAST_LOAD
+    _MANIFEST_LAST_LOAD = time.monotonic()
     HANDWRITING_MANIFEST = _load_handwriting_manifest_from_mongo(MONGO_URI, MONGO_DB, MONGO_MANIFEST_COLLECTION)
+    HANDWRITING_MANIFEST_KEYS = tuple(HANDWRITING_MANIFEST)
     _select_handwriting_challenge()
     try:
         print(
@@ -98,6 +106,15 @@ def get_handwriting_state() -> Tuple[Optional[str], List[str]]:
     return HANDWRITING_CURRENT_CLASS, list(HANDWRITING_CURRENT_IMAGES)
 
 
+def get_handwriting_manifest() -> Tuple[Dict[str, List[str]], Tuple[str, ...]]:
+    """프로세스에 로드된 { class -> [keys] } manifest와 클래스 목록을 반환 (요청마다 Mongo 조회하지 않음)."""
+    if not HANDWRITING_MANIFEST and time.monotonic() - _MANIFEST_LAST_LOAD >= _MANIFEST_RETRY_INTERVAL_SECONDS:
+        with _MANIFEST_LOCK:
+            if not HANDWRITING_MANIFEST and time.monotonic() - _MANIFEST_LAST_LOAD >= _MANIFEST_RETRY_INTERVAL_SECONDS:
+                initialize()
+    return HANDWRITING_MANIFEST, HANDWRITING_MANIFEST_KEYS
+
+
 # Initialize on import
 initialize()
 
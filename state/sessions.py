@@ -1,13 +1,142 @@
-from typing import Dict
+from collections import OrderedDict
+from typing import Generic, Optional, Tuple, TypeVar
 import threading
+import time
 
+from config.settings import CAPTCHA_TTL, SESSION_SWEEP_INTERVAL_SECONDS
 from domain.models import AbstractCaptchaSession, ImageGridCaptchaSession
 
 
-ABSTRACT_SESSIONS: Dict[str, AbstractCaptchaSession] = {}
-ABSTRACT_SESSIONS_LOCK = threading.Lock()
+V = TypeVar("V")
 
-IMAGE_GRID_SESSIONS: Dict[str, ImageGridCaptchaSession] = {}
-IMAGE_GRID_LOCK = threading.Lock()
 
+class TTLSessionStore(Generic[V]):
+    """만료 시각과 함께 보관하는 프로세스 로컬 세션 저장소.
 
+    삽입 순서(OrderedDict)가 곧 만료 순서이므로(TTL이 같을 때) 앞에서부터 만료된 항목만
+    걷어내면 되어 스윕이 항목당 O(1)이다. maxsize를 넘으면 가장 오래된 항목부터 버린다.
+    """
+
+    def __init__(self, maxsize: int, default_ttl: float):
+        self.maxsize = maxsize
+        self.default_ttl = default_ttl
+        self.lock = threading.Lock()
+        self._data: "OrderedDict[str, Tuple[float, V]]" = OrderedDict()
+
+    def _sweep(self, now: float) -> int:
+        # 락을 잡은 상태에서 호출
+        data = self._data
+        removed = 0
+        while data:
+            key, (expires_at, _) = next(iter(data.items()))
+            if expires_at > now:
+                break
+            data.popitem(last=False)
+            removed += 1
+        return removed
+
+    def sweep(self) -> int:
+        """만료된 항목을 제거하고 제거 수를 반환 (쓰기가 없는 동안에도 메모리를 돌려주기 위한 주기 청소용)."""
+        now = time.monotonic()
+        with self.lock:
+            return self._sweep(now)
+
+    def set(self, key: str, value: V, ttl: Optional[float] = None) -> None:
+        now = time.monotonic()
+        expires_at = now + (self.default_ttl if ttl is None else ttl)
+        with self.lock:
+            self._sweep(now)
+            self._data.pop(key, None)
+            self._data[key] = (expires_at, value)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get(self, key: str) -> Optional[V]:
+        now = time.monotonic()
+        with self.lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            if item[0] <= now:
+                self._data.pop(key, None)
+                return None
+            return item[1]
+
+    def pop(self, key: str) -> Optional[V]:
+        """꺼내면서 삭제 (만료된 항목은 None). 1회성 검증에서 원자적 소비용."""
+        now = time.monotonic()
+        with self.lock:
+            item = self._data.pop(key, None)
+        if item is None or item[0] <= now:
+            return None
+        return item[1]
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class ShardedTTLSessionStore(Generic[V]):
+    """키 해시로 나눈 여러 TTLSessionStore 샤드. 서로 다른 챌린지는 다른 락을 잡아 경합하지 않는다."""
+
+    def __init__(self, shards: int, maxsize: int, default_ttl: float):
+        # 샤드 수는 2의 거듭제곱으로 맞춰 & 마스크로 샤드를 고른다
+        count = 1
+        while count < max(1, shards):
+            count <<= 1
+        self._mask = count - 1
+        per_shard = max(1, maxsize // count)
+        self._shards = tuple(TTLSessionStore(maxsize=per_shard, default_ttl=default_ttl) for _ in range(count))
+
+    def _shard(self, key: str) -> TTLSessionStore[V]:
+        return self._shards[hash(key) & self._mask]
+
+    def set(self, key: str, value: V, ttl: Optional[float] = None) -> None:
+        self._shard(key).set(key, value, ttl)
+
+    def get(self, key: str) -> Optional[V]:
+        return self._shard(key).get(key)
+
+    def pop(self, key: str) -> Optional[V]:
+        return self._shard(key).pop(key)
+
+    def sweep(self) -> int:
+        # 샤드 락을 하나씩만 잡아 청소 중에도 다른 샤드 요청은 막지 않음
+        return sum(shard.sweep() for shard in self._shards)
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+
+
+ABSTRACT_SESSIONS: ShardedTTLSessionStore[AbstractCaptchaSession] = ShardedTTLSessionStore(
+    shards=32, maxsize=100_000, default_ttl=CAPTCHA_TTL
+)
+IMAGE_GRID_SESSIONS: ShardedTTLSessionStore[ImageGridCaptchaSession] = ShardedTTLSessionStore(
+    shards=32, maxsize=100_000, default_ttl=CAPTCHA_TTL
+)
+
+_SWEEPER_THREAD: Optional[threading.Thread] = None
+_SWEEPER_LOCK = threading.Lock()
+
+
+def _sweep_loop(interval_seconds: float) -> None:
+    while True:
+        time.sleep(interval_seconds)
+        try:
+            ABSTRACT_SESSIONS.sweep()
+            IMAGE_GRID_SESSIONS.sweep()
+        except Exception as e:
+            print(f"⚠️ 세션 만료 청소 실패: {e}")
+
+
+def start_session_sweeper(interval_seconds: float = SESSION_SWEEP_INTERVAL_SECONDS) -> None:
+    """만료 세션을 주기적으로 걷어내는 데몬 스레드 시작 (프로세스당 1회)."""
+    global _SWEEPER_THREAD
+    if interval_seconds <= 0:
+        return
+    with _SWEEPER_LOCK:
+        if _SWEEPER_THREAD is not None:
+            return
+        _SWEEPER_THREAD = threading.Thread(
+            target=_sweep_loop, args=(interval_seconds,), name="session-sweeper", daemon=True
+        )
+        _SWEEPER_THREAD.start()
@@ -0,0 +1,26 @@
+import pytest
+
+from utils.text import normalize_text
+
+
+def _baseline_normalize(text: str) -> str:
+    return "".join(ch.lower() for ch in text.strip() if ch.isalnum())
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "HΣ",
+        "ΟΔΟΣ ΣΟΦΙΑ",
+        "고양이 Cat!",
+        "ÄbC-d",
+        "İstanbul",
+        "Straße_1",
+        "  ｆｕｌｌ－ｗｉｄｔｈ  ",
+        " Hello, World_1 ",
+        "a-b c\td\n",
+        "",
+    ],
+)
+def test_normalize_text_matches_baseline(text):
+    assert normalize_text(text) == _baseline_normalize(text)
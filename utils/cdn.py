@@ -1,4 +1,7 @@
-from typing import Optional, Callable
+from collections import OrderedDict
+from typing import Optional, Callable, Tuple
+import threading
+import time
 
 
 def build_cdn_url(
@@ -29,12 +32,46 @@ def build_cdn_url(
 
 
 
+# boto3 클라이언트 생성 비용이 커서 프로세스당 1개만 만들어 재사용 (클라이언트는 thread-safe)
+_S3_CLIENT = None
+_S3_CLIENT_LOCK = threading.Lock()
+
+
+def _get_s3_client():
+    global _S3_CLIENT
+    if _S3_CLIENT is not None:
+        return _S3_CLIENT
+    with _S3_CLIENT_LOCK:
+        if _S3_CLIENT is None:
+            from config.settings import (
+                OBJECT_STORAGE_ENDPOINT,
+                OBJECT_STORAGE_REGION,
+                OBJECT_STORAGE_ACCESS_KEY,
+                OBJECT_STORAGE_SECRET_KEY,
+            )
+            import boto3  # type: ignore
+            _S3_CLIENT = boto3.client(
+                "s3",
+                endpoint_url=OBJECT_STORAGE_ENDPOINT,
+                region_name=OBJECT_STORAGE_REGION,
+                aws_access_key_id=OBJECT_STORAGE_ACCESS_KEY,
+                aws_secret_access_key=OBJECT_STORAGE_SECRET_KEY,
+            )
+    return _S3_CLIENT
+
+
+# 키별 presigned URL 캐시: key -> (url, 서명 시각). 만료 전 여유를 두고 TTL 절반까지만 재사용
+# 삽입 순서(FIFO)로 최대 _PRESIGN_CACHE_MAX개까지만 보관
+_PRESIGN_CACHE: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+_PRESIGN_CACHE_MAX = 10_000
+_PRESIGN_CACHE_LOCK = threading.Lock()
+
+
 def presign_url_for_key(key: str) -> Optional[str]:
     from config.settings import (
         ENV,
         OBJECT_STORAGE_BUCKET,
         OBJECT_STORAGE_ENDPOINT,
-        OBJECT_STORAGE_REGION,
         OBJECT_STORAGE_ACCESS_KEY,
         OBJECT_STORAGE_SECRET_KEY,
         PRESIGN_TTL_SECONDS,
@@ -43,21 +80,30 @@ def presign_url_for_key(key: str) -> Optional[str]:
         return None
     if not (OBJECT_STORAGE_BUCKET and OBJECT_STORAGE_ENDPOINT and OBJECT_STORAGE_ACCESS_KEY and OBJECT_STORAGE_SECRET_KEY):
         return None
+    now = time.monotonic()
+    with _PRESIGN_CACHE_LOCK:
+        cached = _PRESIGN_CACHE.get(key)
+    if cached and now - cached[1] < PRESIGN_TTL_SECONDS * 0.5:
+        return cached[0]
     try:
-        import boto3  # type: ignore
-        s3 = boto3.client(
-            "s3",
-            endpoint_url=OBJECT_STORAGE_ENDPOINT,
-            region_name=OBJECT_STORAGE_REGION,
-            aws_access_key_id=OBJECT_STORAGE_ACCESS_KEY,
-            aws_secret_access_key=OBJECT_STORAGE_SECRET_KEY,
-        )
-        return s3.generate_presigned_url(
+        s3 = _get_s3_client()
+        url = s3.generate_presigned_url(
             "get_object",
-            Params={"Bucket": OBJECT_STORAGE_BUCKET, "Key": key},
+            # 서명 URL 응답에 Cache-Control을 실어 브라우저/CDN이 유효기간 동안 재요청 없이 재사용하도록 함
+            Params={
+                "Bucket": OBJECT_STORAGE_BUCKET,
+                "Key": key,
+                "ResponseCacheControl": f"private, max-age={PRESIGN_TTL_SECONDS}",
+            },
             ExpiresIn=PRESIGN_TTL_SECONDS,
             HttpMethod="GET",
         )
+        with _PRESIGN_CACHE_LOCK:
+            _PRESIGN_CACHE.pop(key, None)
+            _PRESIGN_CACHE[key] = (url, now)
+            while len(_PRESIGN_CACHE) > _PRESIGN_CACHE_MAX:
+                _PRESIGN_CACHE.popitem(last=False)
+        return url
     except Exception as e:
         try:
             print(f"⚠️ presign failed: {e}")
@@ -0,0 +1,18 @@
+from typing import Sequence
+
+from fastapi.middleware.cors import CORSMiddleware
+
+
+class FastCORSMiddleware(CORSMiddleware):
+    """허용 Origin 목록을 frozenset으로 고정해 매 요청의 리스트 선형 탐색을 없앤 CORSMiddleware."""
+
+    def __init__(self, app, allow_origins: Sequence[str] = (), **kwargs) -> None:
+        super().__init__(app, allow_origins=allow_origins, **kwargs)
+        self._allow_set = frozenset(allow_origins)
+
+    def is_allowed_origin(self, origin: str) -> bool:
+        if self.allow_all_origins:
+            return True
+        if self.allow_origin_regex is not None and self.allow_origin_regex.fullmatch(origin):
+            return True
+        return origin in self._allow_set
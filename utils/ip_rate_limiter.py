@@ -279,6 +279,8 @@ class IPRateLimiter:
             
             suspicious_ips = []
             for ip in ip_addresses:
+                if isinstance(ip, bytes):
+                    ip = ip.decode()
                 suspicious_key = rkey("suspicious_ips", ip)
                 data = self.redis.get(suspicious_key)
                 if data:
@@ -1,4 +1,10 @@
-def normalize_text(text: str) -> str:
-    return "".join(ch.lower() for ch in text.strip() if ch.isalnum())
+# ASCII 전용 문자열은 비영숫자 삭제 테이블로 translate (문자 단위 제너레이터보다 빠름)
+_ASCII_NON_ALNUM_DELETE = str.maketrans({c: None for c in map(chr, range(128)) if not c.isalnum()})
 
 
+def normalize_text(text: str) -> str:
+    # ASCII는 C 레벨 1회 삭제 후 lower (공백도 함께 제거되므로 strip 불필요, 대소문자 매핑이 문맥과 무관해 결과 동일)
+    if text.isascii():
+        return text.translate(_ASCII_NON_ALNUM_DELETE).lower()
+    # 비ASCII는 문자 단위 lower를 유지: 문자열 전체 lower는 문맥 의존 매핑(예: 어말 시그마 'HΣ' -> 'hς')이 달라짐
+    return "".join(ch.lower() for ch in text.strip() if ch.isalnum())
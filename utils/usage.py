@@ -8,7 +8,7 @@ def validate_api_key(api_key: str) -> Optional[int]:
     Keep it simple: look up in api_keys table. Extend with rate limit as needed.
     """
     try:
-        with get_db_cursor() as cursor:
+        with get_db_cursor(dict_rows=False) as cursor:
             cursor.execute(
                 """
                 SELECT user_id
@@ -19,7 +19,7 @@ def validate_api_key(api_key: str) -> Optional[int]:
                 (api_key,)
             )
             row = cursor.fetchone()
-            return int(row.get("user_id")) if row and row.get("user_id") is not None else None
+            return int(row[0]) if row and row[0] is not None else None
     except Exception:
         return None
 